@@ -0,0 +1,315 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from grid_map import GridMap, FREE, NEIGHBOR_OFFSETS
+from obstacles import ObstaclePlacer
+from robot import Robot
+from robot_memory import DEAD_END_WEIGHTS, DEAD_END_CLASSES
+from status import UNKNOWN, CURRENT, VISITED, OBSTACLE, UNVISITED, PREFERABLE, PRIORITY
+
+# Borda em volta de cada mapa, larga o bastante para ler a pontuação de beco
+# dos nós a dois passos do robô sem checar limites.
+PADDING = 3
+
+
+class BatchSimulation:
+    # Roda a política do Robot (um robô, sem dead_end_weight) em B mapas
+    # independentes ao mesmo tempo. O mapa real e a memória de todos ficam em
+    # arrays (B, células) com índice plano de (x, y) = (x + PADDING) * stride
+    # + y + PADDING; a borda é um obstáculo já conhecido, que vale 2 na
+    # pontuação de beco como fora do mapa no Robot.
+    #
+    # O status de cada nó de fronteira é sempre a classe da sua pontuação
+    # atual, então depois de cada passo basta reclassificar a fronteira a até
+    # dois passos do robô. As buscas desempatam alvos e caminhos pela mesma
+    # ordem de descoberta da busca do WallFollowingPlanner, então cada mapa
+    # tem a mesma trajetória que teria com o Robot.
+
+    def __init__(self, cells, starts, rotation_offsets=2):
+        cells = np.asarray(cells)
+        self.batch_size, self.map_size = cells.shape[0], cells.shape[1]
+        n, p = self.map_size, PADDING
+        self.stride = s = n + 2 * p
+        # Mesma ordem de direções do Robot: EAST, SOUTH, WEST, NORTH.
+        self.directions = np.array([s, -1, -s, 1])
+        # Ordem em que a busca do planner lê os vizinhos (NEIGHBOR_OFFSETS).
+        self.search_offsets = np.array([dx * s + dy for dx, dy in NEIGHBOR_OFFSETS])
+        self.close_offsets = np.array([dx * s + dy for dx in range(-2, 3) for dy in range(-2, 3) if 0 < abs(dx) + abs(dy) <= 2])
+        self.weights = np.array(DEAD_END_WEIGHTS, dtype=np.int8)
+
+        free = np.zeros((self.batch_size, s, s), dtype=bool)
+        free[:, p:p + n, p:p + n] = cells == FREE
+        self.free = free.reshape(self.batch_size, -1)
+        memory = np.full((self.batch_size, s, s), OBSTACLE, dtype=np.uint8)
+        memory[:, p:p + n, p:p + n] = UNKNOWN
+        self.memory = memory.reshape(self.batch_size, -1)
+
+        starts = np.asarray(starts)
+        self.positions = (starts[:, 0] + p) * s + starts[:, 1] + p
+        self.rotation_offsets = np.array(np.broadcast_to(rotation_offsets, self.batch_size))
+        self.repeated_spaces = np.zeros(self.batch_size, dtype=np.int64)
+        self.steps = np.zeros(self.batch_size, dtype=np.int64)
+        self.done = np.zeros(self.batch_size, dtype=bool)
+
+        # Caminhos em andamento, um por linha. A largura cresce com o maior
+        # caminho já planejado.
+        self.paths = np.zeros((self.batch_size, 1), dtype=np.int64)
+        self.path_lengths = np.zeros(self.batch_size, dtype=np.int64)
+        self.path_positions = np.zeros(self.batch_size, dtype=np.int64)
+
+        rows = np.arange(self.batch_size)
+        self.memory[rows, self.positions] = CURRENT
+        self.__update_neighbors(rows)
+
+    def get_positions(self) -> np.ndarray:
+        return np.stack(divmod(self.positions, self.stride), axis=1) - PADDING
+
+    def get_node_status_array(self, index) -> np.ndarray:
+        n, p = self.map_size, PADDING
+        return self.memory[index].reshape(self.stride, self.stride)[p:p + n, p:p + n]
+
+    def get_repeated_spaces(self) -> np.ndarray:
+        return self.repeated_spaces
+
+    def get_steps(self) -> np.ndarray:
+        return self.steps
+
+    def run(self) -> np.ndarray:
+        while self.step():
+            pass
+        return self.repeated_spaces
+
+    def step(self) -> int:
+        # Um passo em todos os mapas que ainda não terminaram. Devolve quantos
+        # robôs andaram.
+        active = np.flatnonzero(~self.done)
+        planning = active[self.path_positions[active] == self.path_lengths[active]]
+        if len(planning):
+            self.__find_next_path(planning)
+        has_path = self.path_positions[active] < self.path_lengths[active]
+        self.done[active[~has_path]] = True
+        moving = active[has_path]
+        if len(moving) == 0:
+            return 0
+
+        nodes = self.paths[moving, self.path_positions[moving]]
+        self.path_positions[moving] += 1
+        self.repeated_spaces[moving] += self.memory[moving, nodes] == VISITED
+        self.steps[moving] += 1
+        self.memory[moving, self.positions[moving]] = VISITED
+        self.positions[moving] = nodes
+        self.memory[moving, nodes] = CURRENT
+        self.__update_neighbors(moving)
+        return len(moving)
+
+    def __update_neighbors(self, rows):
+        # Descobre os 4 vizinhos e reclassifica a fronteira a até dois passos,
+        # que é onde as pontuações de beco podem ter mudado.
+        neighbors = self.positions[rows, None] + self.directions
+        status = self.memory[rows[:, None], neighbors]
+        self.memory[rows[:, None], neighbors] = np.where(~self.free[rows[:, None], neighbors], OBSTACLE,
+                                                         np.where(status == VISITED, VISITED, UNVISITED))
+
+        nodes = self.positions[rows, None] + self.close_offsets
+        status = self.memory[rows[:, None], nodes]
+        scores = self.weights[self.memory[rows[:, None, None], nodes[:, :, None] + self.directions]].sum(axis=2)
+        self.memory[rows[:, None], nodes] = np.where(status >= UNVISITED, DEAD_END_CLASSES[scores], status)
+
+    def __find_next_path(self, rows):
+        self.path_positions[rows] = 0
+        self.path_lengths[rows] = 0
+        pending = np.ones(len(rows), dtype=bool)
+
+        # Um priority a dois passos vira caminho direto, desde que não haja
+        # um ao lado (WallFollowingPlanner.__search_nodes com close_distance).
+        first = self.positions[rows, None] + self.search_offsets
+        first_status = self.memory[rows[:, None], first]
+        second = first[:, :, None] + self.search_offsets
+        passable = (first_status >= CURRENT) & (first_status != OBSTACLE)
+        valid = passable[:, :, None] & (self.memory[rows[:, None, None], second] == PRIORITY)
+        close = valid.any(axis=(1, 2)) & ~(first_status == PRIORITY).any(axis=1)
+        if close.any():
+            # Vizinhos de fronteira primeiro, como no planners.frontier_first.
+            order = (first_status < UNVISITED) * 16 + np.arange(4) * 4
+            ranks = np.where(valid, order[:, :, None] + np.arange(4), 64).reshape(len(rows), 16)[close]
+            choice = ranks.argmin(axis=1)
+            picked = np.flatnonzero(close)
+            self.__set_paths(rows[picked], np.stack([first[picked, choice // 4], second[picked, choice // 4, choice % 4]], axis=1),
+                             np.full(len(picked), 2))
+            pending &= ~close
+
+        neighbors = self.positions[rows, None] + self.directions
+        neighbor_status = self.memory[rows[:, None], neighbors]
+
+        # Giro a partir de rotation_offset: priority, depois preferable,
+        # depois unvisited.
+        directions = (self.rotation_offsets[rows, None] + np.arange(4)) % 4
+        rotated_status = np.take_along_axis(neighbor_status, directions, axis=1)
+        for status in (PRIORITY, PREFERABLE, UNVISITED):
+            matches = rotated_status == status
+            hit = pending & matches.any(axis=1)
+            if hit.any():
+                picked = np.flatnonzero(hit)
+                direction = directions[picked, matches[picked].argmax(axis=1)]
+                self.rotation_offsets[rows[picked]] = direction
+                self.__set_paths(rows[picked], neighbors[picked, direction][:, None], np.ones(len(picked), dtype=np.int64))
+                pending &= ~hit
+
+        if pending.any():
+            self.__search_nodes(rows[pending])
+
+    def __search_nodes(self, rows):
+        # Busca em largura por camadas em todos os mapas ao mesmo tempo, até
+        # cada um achar uma camada com fronteira. Nela vale o nó de maior
+        # classe (priority > preferable > unvisited) e, entre esses, o
+        # primeiro descoberto.
+        #
+        # Cada camada é uma lista de (mapa, nó) na ordem de descoberta da
+        # busca do planner: os filhos saem na ordem da camada e, para cada
+        # pai, na ordem do frontier_first. Um nó alcançado por mais de um pai
+        # fica com o primeiro, e o pai é guardado pelo índice do vizinho.
+        count = len(rows)
+        memory = self.memory[rows]
+        distances = np.full(memory.shape, -1, dtype=np.int32)
+        parents = np.full(memory.shape, -1, dtype=np.int8)
+        layer_rows = np.arange(count)
+        layer_nodes = self.positions[rows]
+        distances[layer_rows, layer_nodes] = 0
+        targets = np.full(count, -1, dtype=np.int64)
+
+        depth = 0
+        while len(layer_rows):
+            depth += 1
+            child_rows = np.repeat(layer_rows, 4)
+            child_nodes = (layer_nodes[:, None] + self.search_offsets).ravel()
+            indexes = np.tile(np.arange(4), len(layer_rows))
+            status = memory[child_rows, child_nodes]
+            # Posição do pai * 8, depois fronteira antes do resto, depois a
+            # ordem de NEIGHBOR_OFFSETS.
+            keys = np.arange(len(child_rows)) // 4 * 8 + (status < UNVISITED) * 4 + indexes
+            new = (status >= CURRENT) & (status != OBSTACLE) & (distances[child_rows, child_nodes] < 0)
+            order = np.flatnonzero(new)[np.argsort(keys[new])]
+            _, first = np.unique(child_rows[order] * memory.shape[1] + child_nodes[order], return_index=True)
+            order = order[np.sort(first)]
+            layer_rows, layer_nodes = child_rows[order], child_nodes[order]
+            distances[layer_rows, layer_nodes] = depth
+            parents[layer_rows, layer_nodes] = indexes[order]
+
+            status = memory[layer_rows, layer_nodes]
+            reached = np.flatnonzero(status >= UNVISITED)
+            if len(reached):
+                reached = reached[np.lexsort((reached, PRIORITY - status[reached], layer_rows[reached]))]
+                hit, first = np.unique(layer_rows[reached], return_index=True)
+                targets[hit] = layer_nodes[reached[first]]
+                searching = targets[layer_rows] < 0
+                layer_rows, layer_nodes = layer_rows[searching], layer_nodes[searching]
+
+        found = np.flatnonzero(targets >= 0)
+        if len(found) == 0:
+            return
+        lengths = distances[found, targets[found]].astype(np.int64)
+        paths = np.zeros((len(found), int(lengths.max())), dtype=np.int64)
+        current = targets[found]
+        for step in range(paths.shape[1], 0, -1):
+            # Volta do alvo até a origem pelo pai de cada nó.
+            selected = np.flatnonzero(lengths >= step)
+            paths[selected, step - 1] = current[selected]
+            if step == 1:
+                break
+            current[selected] -= self.search_offsets[parents[found[selected], current[selected]]]
+        self.__set_paths(rows[found], paths, lengths)
+
+    def __set_paths(self, rows, paths, lengths):
+        if paths.shape[1] > self.paths.shape[1]:
+            wider = np.zeros((self.batch_size, paths.shape[1]), dtype=np.int64)
+            wider[:, :self.paths.shape[1]] = self.paths
+            self.paths = wider
+        self.paths[rows, :paths.shape[1]] = paths
+        self.path_lengths[rows] = lengths
+        self.path_positions[rows] = 0
+
+
+def generate_maps(count, map_size, obstacle_density=None, rng=random):
+    # Mapas aleatórios como os do Environment: obstáculos pelo ObstaclePlacer
+    # e partida na maior componente conexa.
+    cells = np.full((count, map_size, map_size), FREE, dtype=np.uint8)
+    starts = np.zeros((count, 2), dtype=np.int64)
+    short_maps = 0
+    for i in range(count):
+        if obstacle_density is None:
+            number_of_obstacles = rng.randint(int(15/100 * pow(map_size, 2)), int(25/100 * pow(map_size, 2)))
+        else:
+            number_of_obstacles = int(obstacle_density * pow(map_size, 2))
+        map_graph = GridMap(map_size, cells[i])
+        obstacles = ObstaclePlacer(map_size).place_random(number_of_obstacles, rng)
+        short_maps += len(obstacles) < number_of_obstacles
+        map_graph.set_obstacles(obstacles)
+        largest = map_graph.largest_component()
+        if largest == -1:
+            raise ValueError("O mapa não tem nenhuma célula livre para o robô nascer")
+        possible_spawns = np.flatnonzero(map_graph.label_components().ravel() == largest)
+        starts[i] = divmod(int(rng.choice(possible_spawns)), map_size)
+    if short_maps:
+        print(f"Aviso: {short_maps} de {count} mapas ficaram com menos obstáculos que o pedido, para não desconectar o mapa")
+    return cells, starts
+
+
+def run_robots(cells, starts, rotation_offset=2) -> np.ndarray:
+    # Mesmos mapas rodados um a um com o Robot, para comparar.
+    repeated_spaces = []
+    for map_cells, start in zip(cells, starts):
+        robot = Robot(tuple(start), GridMap(len(map_cells), map_cells.copy()))
+        robot.rotation_offset = rotation_offset
+        while robot.move():
+            pass
+        repeated_spaces.append(robot.get_repeated_spaces())
+    return np.array(repeated_spaces)
+
+
+def parse_density(value):
+    if value == 'random':
+        return None
+    return float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Roda a política da Solucao2 em muitos mapas de uma vez, variando rotation_offset e densidade.')
+    parser.add_argument('--size', type=int, default=10)
+    parser.add_argument('--maps', type=int, default=1000)
+    parser.add_argument('--densities', type=parse_density, nargs='+', default=[None], help="fração de obstáculos, ou 'random' para 15%%-25%%")
+    parser.add_argument('--offsets', type=int, nargs='+', default=[0, 1, 2, 3], choices=[0, 1, 2, 3])
+    parser.add_argument('--compare', type=int, default=0, help='quantos mapas rodar também com o Robot, para comparar')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for obstacle_density in args.densities:
+        cells, starts = generate_maps(args.maps, args.size, obstacle_density, rng)
+        # Um lote só com uma cópia dos mapas para cada rotation_offset.
+        offsets = np.repeat(args.offsets, args.maps)
+        start = time.perf_counter()
+        simulation = BatchSimulation(np.tile(cells, (len(args.offsets), 1, 1)), np.tile(starts, (len(args.offsets), 1)), offsets)
+        repeated_spaces = simulation.run()
+        wall_time = time.perf_counter() - start
+
+        densidade = 'aleatória' if obstacle_density is None else obstacle_density
+        print(f"mapa {args.size} | densidade {densidade} | {len(offsets)} simulações em {wall_time:.2f}s ({len(offsets) / wall_time:.0f}/s)")
+        for rotation_offset in args.offsets:
+            passos = repeated_spaces[offsets == rotation_offset]
+            print(f"  rotation_offset {rotation_offset}: Passos redundantes: média {passos.mean():.2f} (dp {passos.std():.2f}). "
+                  f"Mínimo: {passos.min()}. Máximo: {passos.max()}")
+
+        if args.compare:
+            count = min(args.compare, args.maps)
+            start = time.perf_counter()
+            passos = run_robots(cells[:count], starts[:count])
+            wall_time = time.perf_counter() - start
+            print(f"  Robot em {count} mapas: {wall_time:.2f}s ({count / wall_time:.0f}/s), "
+                  f"Passos redundantes: média {passos.mean():.2f}")
+
+
+if __name__ == "__main__":
+    main()
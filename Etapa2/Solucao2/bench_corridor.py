@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from grid_map import GridMap
+from robot import Robot
+
+
+def create_corridor_map(map_size) -> GridMap:
+    # Um único corredor em zigue-zague: linhas pares livres, linhas ímpares
+    # bloqueadas exceto por uma passagem alternando entre as pontas.
+    map_graph = GridMap(map_size)
+    obstacles = []
+    for y in range(1, map_size, 2):
+        passage = map_size - 1 if (y // 2) % 2 == 0 else 0
+        for x in range(map_size):
+            if x != passage or y + 1 >= map_size:
+                obstacles.append((x, y))
+    map_graph.set_obstacles(obstacles)
+    return map_graph
+
+
+def corridor_middle(map_size) -> tuple:
+    rows = (map_size + 1) // 2
+    row = rows // 2
+    return (map_size // 2, row * 2)
+
+
+def run_corridor(map_size) -> dict:
+    map_graph = create_corridor_map(map_size)
+    robot = Robot(corridor_middle(map_size), map_graph)
+    longest_path = 0
+    start = time.perf_counter()
+    while robot.move():
+        longest_path = max(longest_path, len(robot.current_path) + 1)
+    wall_time = time.perf_counter() - start
+    return {
+        'map_size': map_size,
+        'steps': robot.get_steps(),
+        'redundant_steps': robot.get_repeated_spaces(),
+        'longest_path': longest_path,
+        'wall_time': wall_time,
+        'us_per_step': wall_time / robot.get_steps() * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede o custo por passo num corredor longo, onde o robô precisa voltar por metade do mapa.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 200, 300, 500])
+    args = parser.parse_args()
+
+    for map_size in args.sizes:
+        result = run_corridor(map_size)
+        print(f"mapa {result['map_size']}: {result['steps']} passos, {result['redundant_steps']} redundantes, "
+              f"maior caminho {result['longest_path']}, {result['wall_time']:.2f}s, {result['us_per_step']:.1f} us/passo")
+
+
+if __name__ == "__main__":
+    main()
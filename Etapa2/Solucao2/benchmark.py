@@ -0,0 +1,166 @@
+import argparse
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from environment import Environment
+from planners import PLANNERS
+from sensor import Sensor, SENSOR_METRICS
+
+SOLUCAO1_ROBOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Solucao1', 'robot.py')
+FIELDS = ['solution', 'map_size', 'obstacle_density', 'robots', 'sensor_radius', 'sensor_metric', 'planner', 'trial', 'seed', 'redundant_steps', 'total_steps', 'ticks', 'wall_time', 'steps_per_second']
+
+solucao1_robot = None
+
+
+def load_solucao1_robot():
+    # As duas soluções têm um módulo chamado robot, então o da Solucao1 é
+    # carregado com outro nome.
+    global solucao1_robot
+    if solucao1_robot is None:
+        spec = importlib.util.spec_from_file_location('solucao1_robot', SOLUCAO1_ROBOT_PATH)
+        solucao1_robot = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(solucao1_robot)
+    return solucao1_robot.Robot
+
+
+def run_trial(task) -> dict:
+    solution, map_size, obstacle_density, robot_count, sensor_radius, sensor_metric, planner, trial, seed, map_cache = task
+    sensor = Sensor(sensor_radius, sensor_metric)
+    # Cada tentativa tem a própria semente, então as duas soluções recebem o
+    # mesmo mapa e o mesmo ponto de partida.
+    environment = Environment()
+    with contextlib.redirect_stdout(io.StringIO()):
+        environment.prepare_simulation(map_size, headless=True, obstacle_density=obstacle_density, robot_count=robot_count,
+                                       seed=seed, map_cache=map_cache, sensor=sensor, planner=planner)
+
+    # Só a exploração entra no tempo; gerar o mapa é igual para as duas.
+    if solution == 1:
+        robot = load_solucao1_robot()(tuple(environment.robot_pos), environment.map_graph.to_networkx())
+        start = time.perf_counter()
+        total_steps = 0
+        while robot.move():
+            total_steps += 1
+        wall_time = time.perf_counter() - start
+        redundant_steps = robot.get_repeated_spaces()
+        ticks = total_steps
+    else:
+        start = time.perf_counter()
+        while environment.step():
+            pass
+        wall_time = time.perf_counter() - start
+        total_steps = sum(robot.get_steps() for robot in environment.robots)
+        redundant_steps = environment.get_repeated_spaces()
+        ticks = environment.ticks
+
+    return {
+        'solution': solution,
+        'map_size': map_size,
+        'obstacle_density': obstacle_density,
+        'robots': robot_count,
+        'sensor_radius': sensor_radius,
+        'sensor_metric': sensor_metric,
+        'planner': planner,
+        'trial': trial,
+        'seed': seed,
+        'redundant_steps': redundant_steps,
+        'total_steps': total_steps,
+        'ticks': ticks,
+        'wall_time': wall_time,
+        'steps_per_second': total_steps / wall_time if wall_time > 0 else 0.0
+    }
+
+
+def create_tasks(solutions, map_sizes, obstacle_densities, trials, base_seed, robot_counts=(1,), map_cache=False, sensor_radii=(1,), sensor_metric='manhattan',
+                 planners=('wall_following',)) -> list:
+    tasks = []
+    for map_size in map_sizes:
+        for density_index, obstacle_density in enumerate(obstacle_densities):
+            seeds = np.random.SeedSequence([base_seed, map_size, density_index]).generate_state(trials)
+            for trial, seed in enumerate(seeds.tolist()):
+                for robot_count in robot_counts:
+                    for sensor_radius in sensor_radii:
+                        for solution in solutions:
+                            # A Solucao1 só sabe andar com um robô e o sensor padrão, e não tem planners.
+                            if solution == 1:
+                                if robot_count == 1 and Sensor(sensor_radius, sensor_metric).is_adjacent_only():
+                                    tasks.append((solution, map_size, obstacle_density, robot_count, sensor_radius, sensor_metric, None, trial, seed, map_cache))
+                                continue
+                            for planner in planners:
+                                tasks.append((solution, map_size, obstacle_density, robot_count, sensor_radius, sensor_metric, planner, trial, seed, map_cache))
+    return tasks
+
+
+def run_benchmark(solutions=(1, 2), map_sizes=(10,), obstacle_densities=(None,), trials=100, workers=None, base_seed=0, robot_counts=(1,), map_cache=False,
+                  sensor_radii=(1,), sensor_metric='manhattan', planners=('wall_following',)) -> list:
+    tasks = create_tasks(solutions, map_sizes, obstacle_densities, trials, base_seed, robot_counts, map_cache, sensor_radii, sensor_metric, planners)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_trial, tasks, chunksize=max(1, len(tasks) // (8 * (workers or os.cpu_count() or 1)))))
+
+
+def write_results(results, path):
+    if path.endswith('.json'):
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def print_summary(results):
+    groups = {}
+    for row in results:
+        groups.setdefault((row['solution'], row['map_size'], row['obstacle_density'], row['robots'], row['sensor_radius'], row['planner']), []).append(row)
+    for (solution, map_size, obstacle_density, robot_count, sensor_radius, planner), rows in sorted(groups.items(), key=lambda item: str(item[0])):
+        passos = np.array([row['redundant_steps'] for row in rows])
+        tiques = np.array([row['ticks'] for row in rows])
+        velocidade = np.array([row['steps_per_second'] for row in rows])
+        densidade = 'aleatória' if obstacle_density is None else obstacle_density
+        nome = f"Solucao{solution}" if planner is None else f"Solucao{solution} ({planner})"
+        print(f"{nome} | mapa {map_size} | densidade {densidade} | robôs {robot_count} | sensor {sensor_radius} | tentativas {len(rows)} | "
+              f"Passos redundantes: média {passos.mean():.2f} (dp {passos.std():.2f}). Mínimo: {passos.min()}. Máximo: {passos.max()}. "
+              f"Tiques: {tiques.mean():.1f}. Passos/s: {velocidade.mean():.0f}")
+
+
+def parse_density(value):
+    if value == 'random':
+        return None
+    return float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Roda várias simulações em paralelo e compara as soluções da Etapa 2.')
+    parser.add_argument('--solutions', type=int, nargs='+', default=[1, 2], choices=[1, 2])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10])
+    parser.add_argument('--densities', type=parse_density, nargs='+', default=[None], help="fração de obstáculos, ou 'random' para 15%%-25%%")
+    parser.add_argument('--robots', type=int, nargs='+', default=[1], help='quantidade de robôs explorando o mesmo mapa (só Solucao2)')
+    parser.add_argument('--sensor-radius', type=int, nargs='+', default=[1], help='alcance do sensor do robô (só Solucao2)')
+    parser.add_argument('--sensor-metric', default='manhattan', choices=SENSOR_METRICS)
+    parser.add_argument('--planners', nargs='+', default=['wall_following'], choices=list(PLANNERS), help='estratégias de exploração comparadas (só Solucao2)')
+    parser.add_argument('--trials', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--map-cache', action='store_true', help='guarda os mapas gerados em maps/cache e reaproveita nas próximas rodadas')
+    parser.add_argument('--output', default=None, help='arquivo .csv ou .json com uma linha por tentativa')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_benchmark(args.solutions, args.sizes, args.densities, args.trials, args.workers, args.seed, args.robots, args.map_cache,
+                            args.sensor_radius, args.sensor_metric, args.planners)
+    print_summary(results)
+    print(f"{len(results)} simulações em {time.perf_counter() - start:.1f}s")
+    if args.output:
+        write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
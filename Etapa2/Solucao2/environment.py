@@ -1,43 +1,112 @@
 import random
-import networkx as nx
-import matplotlib.pyplot as plt
-from collections import deque
+from time import perf_counter
+import numpy as np
 from robot import Robot
+from robot_memory import RobotMemory
+from grid_map import GridMap, OBSTACLE
+from map_store import MapStore
+from obstacles import ObstaclePlacer
+from planners import PLANNERS
+from status import NodeStatus
+
+# Mapas fixos do MapStore, pelo número usado em create_obstacles.
+FIXED_MAPS = {1: 'default'}
 
 class Environment:
     def __init__(self):
         self.graph_colors = {
-            "current": "#FF7777",
-            "visited": "#333333",
-            "unvisited": "#AAAAAA",
-            "preferable": "#EEEEAA",
-            "priority": "#AAEEAA",
-            "obstacle": "#225C95",
-            "undiscovered_path": "#EEEEEE",
-            "undiscovered_obstacle": "#90ADC9",
-            "default": "#DDDDDD"
+            NodeStatus.UNKNOWN: "#FFFFFF",
+            NodeStatus.CURRENT: "#FF7777",
+            NodeStatus.VISITED: "#333333",
+            NodeStatus.UNVISITED: "#AAAAAA",
+            NodeStatus.PREFERABLE: "#EEEEAA",
+            NodeStatus.PRIORITY: "#AAEEAA",
+            NodeStatus.OBSTACLE: "#225C95",
+            NodeStatus.UNDISCOVERED_PATH: "#EEEEEE",
+            NodeStatus.UNDISCOVERED_OBSTACLE: "#90ADC9"
         }
-        self.fig = None
-        self.ax = None
-        
-    def run_simulation(self, map_size=10) -> int:
-        self.map_size = map_size
-        plt.ion()
-        self.set_settings()
-        self.generate_map()
-        self.create_robot()
+        self.renderer = None
+        self.map_store = MapStore()
+
+    def run_simulation(self, map_size=10, headless=False, frame_sink=None, obstacle_density=None, robot_count=1, shared_memory=True, seed=None, map_cache=False, profiler=None, sensor=None, planner=None) -> int:
+        self.prepare_simulation(map_size, headless, frame_sink, obstacle_density, robot_count, shared_memory, seed, map_cache, profiler, sensor, planner)
         self.draw_map()
 
         has_moves_left = True
         while(has_moves_left):         
-            has_moves_left = self.robot.move()
+            has_moves_left = self.step()
             self.draw_map()
                 
         if self.should_draw_map:
-            plt.ioff()
-            plt.show()
+            self.get_renderer().show()
+
+        if self.profiler is not None:
+            print(self.profiler.report())
+
+        return self.get_repeated_spaces()
+
+    def prepare_simulation(self, map_size=10, headless=False, frame_sink=None, obstacle_density=None, robot_count=1, shared_memory=True, seed=None, map_cache=False, profiler=None, sensor=None, planner=None):
+        # Todo sorteio sai destes geradores, então a mesma semente sempre gera
+        # a mesma simulação. A partida tem um gerador próprio, tirado antes do
+        # mapa, para sair igual quando o mapa vem do cache.
+        self.rng = random.Random(seed)
+        self.spawn_rng = random.Random(self.rng.getrandbits(64))
+        self.seed = seed
+        self.map_cache = map_cache
+        self.profiler = profiler
+        self.sensor = sensor
+        # Nome da estratégia em PLANNERS; None usa a padrão do Robot.
+        self.planner = planner
+        self.map_size = map_size
+        self.headless = headless
+        self.frame_sink = frame_sink
+        self.obstacle_density = obstacle_density
+        self.robot_count = robot_count
+        self.shared_memory = shared_memory
+        self.ticks = 0
+        self.set_settings()
+        self.generate_map()
+        self.create_robots()
+        if self.should_draw_map:
+            self.get_renderer().start(self.map_graph, self.draw_only_robot_memory)
+
+    def replay_trace(self, trace, headless=False, frame_sink=None) -> int:
+        # Refaz uma simulação gravada sem rodar a decisão dos robôs: cada robô
+        # só anda até a posição gravada, e a memória é atualizada como antes.
+        self.map_size = trace.map_size
+        self.headless = headless
+        self.frame_sink = frame_sink
+        self.robot_count = len(trace.get_starts())
+        self.shared_memory = trace.shared_memory
+        self.sensor = trace.sensor
+        self.profiler = None
+        self.ticks = 0
+        self.set_settings()
+        self.map_graph = trace.map_graph
+        self.obstacle_list = self.map_graph.obstacles()
+        self.claimed_targets = None
+        memory = self.create_memory() if self.shared_memory and self.robot_count > 1 else None
+        self.robots = [Robot(position, self.map_graph, memory=memory or self.create_memory(), sensor=self.sensor) for position in trace.get_starts()]
+        self.robot = self.robots[0]
+        self.robot_pos = list(self.robot.get_current_position())
+        if self.should_draw_map:
+            self.get_renderer().start(self.map_graph, self.draw_only_robot_memory)
+        self.draw_map()
+
+        for positions in trace.replay():
+            moved = False
+            for robot, position in zip(self.robots, positions):
+                if position != robot.get_current_position():
+                    robot.current_path.append(position)
+                    moved = robot.move() or moved
+            if moved:
+                self.ticks += 1
+            self.draw_map()
+
+        if self.should_draw_map:
+            self.get_renderer().show()
 
-        return self.robot.get_repeated_spaces()
+        return self.get_repeated_spaces()
 
     def set_settings(self):
         #self.should_draw_map = self.wait_input('Do you want to draw the map? [Y] OR [N]: ')
@@ -49,22 +118,74 @@ class Environment:
         self.draw_only_robot_memory = False
         self.preloaded_map = False
 
+        if self.headless:
+            self.should_draw_map = False
+
     def generate_map(self):
-        self.map_graph = nx.grid_2d_graph(self.map_size, self.map_size)
+        self.map_graph = GridMap(self.map_size)
         self.obstacle_list = []
-        for node in self.map_graph.nodes():
-            self.map_graph.nodes[node]['status'] = 'undiscovered_path'
         if self.preloaded_map:
             self.obstacle_list = self.create_obstacles(1)
+        elif self.map_cache and self.seed is not None:
+            # Mapas aleatórios com semente são guardados no MapStore e, na
+            # próxima vez, lidos de lá em vez de gerados de novo.
+            obstacles = self.map_store.get_random_map(self.map_size, self.obstacle_density, self.seed, self.create_random_obstacle_map)
+            self.map_graph.set_obstacle_mask(obstacles)
+            self.obstacle_list = self.map_graph.obstacles()
         else:
             self.obstacle_list = self.create_obstacles()
 
+    def step(self) -> bool:
+        # Um tique: cada robô dá no máximo um passo. Se algum alvo ainda
+        # estava reservado no começo do tique, roda mais um, porque um robô
+        # parado pode ter ficado sem alvo só por causa da reserva.
+        if self.profiler is not None:
+            start = perf_counter()
+        claims_pending = bool(self.claimed_targets)
+        moved = False
+        for robot in self.robots:
+            if robot.move():
+                moved = True
+        if moved:
+            self.ticks += 1
+        if self.profiler is not None:
+            self.profiler.add_time('step', start)
+        return moved or claims_pending
+
+    def get_repeated_spaces(self) -> int:
+        return sum(robot.get_repeated_spaces() for robot in self.robots)
+
+    def get_memories(self) -> list:
+        memories = {}
+        for robot in self.robots:
+            memories[id(robot.get_memory())] = robot.get_memory()
+        return list(memories.values())
+
     def draw_map(self):
+        if self.frame_sink is None and not self.should_draw_map:
+            return
+        if self.profiler is not None:
+            start = perf_counter()
+        changes = {}
+        for memory in self.get_memories():
+            changes.update({node: memory.get_node_status(node) for node in memory.pop_changed_nodes()})
+        if self.frame_sink is not None:
+            positions = tuple(robot.get_current_position() for robot in self.robots)
+            self.frame_sink.record(positions, self.get_repeated_spaces(), changes)
         if self.should_draw_map:
-            if not self.fig or not self.ax or not plt.fignum_exists(self.fig.number):
-                self.fig, self.ax = plt.subplots(figsize=(8, 8))
-            self.update_graph()
-            plt.pause(1)
+            self.get_renderer().draw(changes, self.get_repeated_spaces())
+        if self.profiler is not None:
+            self.profiler.add_time('draw', start)
+
+    def get_renderer(self):
+        if self.renderer is None:
+            # Importado só aqui para que o modo headless nunca carregue o matplotlib.
+            from renderer import MapRenderer
+            self.renderer = MapRenderer(self.graph_colors)
+        return self.renderer
+
+    def replay(self, frame_recorder):
+        self.get_renderer().replay(self.map_graph, frame_recorder, self.draw_only_robot_memory)
 
     def wait_input(self, message) -> bool:
         while (True):
@@ -76,125 +197,82 @@ class Environment:
         return response.upper() == "Y"
 
     def random_spawn_position(self) -> tuple:
-        ignore_nodes = []
-        has_path = False
-        for node in self.map_graph.nodes():
-            has_path = False
-            for neighbor in self.map_graph.neighbors(node):
-                if nx.has_path(self.map_graph, neighbor, node):
-                    has_path = True
-                    break
-            if not has_path:
-                ignore_nodes.append(node)
-        
-        possible_spawns = [node for node in self.map_graph.nodes() if node not in ignore_nodes]
-        random_spawn = random.choice(possible_spawns)
+        # Nasce na maior componente conexa, que sempre tem alguma aresta a não
+        # ser que o mapa tenha uma única célula livre.
+        possible_spawns = self.get_possible_spawns()
+        random_spawn = divmod(int(self.spawn_rng.choice(possible_spawns)), self.map_size)
         return random_spawn
 
-    def create_robot(self):
+    def random_spawn_positions(self, count) -> list:
+        if count == 1:
+            return [self.random_spawn_position()]
+        possible_spawns = self.get_possible_spawns().tolist()
+        return [divmod(index, self.map_size) for index in self.spawn_rng.sample(possible_spawns, min(count, len(possible_spawns)))]
+
+    def get_possible_spawns(self) -> np.ndarray:
+        # Índices planos das células da maior componente. Sem nenhuma célula
+        # livre, largest_component() devolve -1, o rótulo dos obstáculos.
+        self.component_labels = self.map_graph.label_components()
+        largest = self.map_graph.largest_component()
+        if largest == -1:
+            raise ValueError("O mapa não tem nenhuma célula livre para o robô nascer")
+        return np.flatnonzero(self.component_labels.ravel() == largest)
+
+    def is_reachable(self, u, v) -> bool:
+        return self.map_graph.is_reachable(u, v)
+
+    def create_robots(self):
         if self.preloaded_map:
-            self.robot_pos = list((0, 9))
+            positions = [(0, 9)]
+            if self.robot_count > 1:
+                positions += [node for node in self.random_spawn_positions(self.robot_count) if node != (0, 9)][:self.robot_count - 1]
         else:
-            self.robot_pos = list(self.random_spawn_position())
-        print(f"Starting position: {tuple(self.robot_pos)}")
-        self.robot = Robot(tuple(self.robot_pos), self.map_graph)
+            positions = self.random_spawn_positions(self.robot_count)
+        self.robot_pos = list(positions[0])
+        print(f"Starting position: {', '.join(str(tuple(position)) for position in positions)}")
+
+        # Com mais de um robô os alvos de busca são reservados, para que dois
+        # robôs não andem até a mesma fronteira.
+        self.claimed_targets = {} if len(positions) > 1 else None
+        memory = self.create_memory() if self.shared_memory and len(positions) > 1 else None
+        self.robots = [Robot(tuple(position), self.map_graph, memory=memory or self.create_memory(), claimed_targets=self.claimed_targets,
+                             profiler=self.profiler, sensor=self.sensor, planner=self.create_planner()) for position in positions]
+        self.robot = self.robots[0]
             
-    def update_graph(self):
-        self.ax.clear()
-        
-        self.robot_memory = self.robot.get_robot_memory()
-        if self.draw_only_robot_memory:
-            self.graph_to_draw = self.robot_memory
-        else:
-            self.graph_to_draw = self.map_graph
-
-        pos = {node: node for node in self.graph_to_draw.nodes()}
-        node_colors_map = []
-        for node in self.graph_to_draw.nodes():
-            if node in self.robot_memory.nodes():
-                if self.robot.get_node_status(node)  == 'current':
-                    node_colors_map.append(self.graph_colors.get("current"))
-                elif self.robot.get_node_status(node)  == "visited":
-                    node_colors_map.append(self.graph_colors.get("visited"))
-                elif self.robot.get_node_status(node) == "unvisited":
-                    node_colors_map.append(self.graph_colors.get("unvisited"))
-                elif self.robot.get_node_status(node) == "preferable":
-                    node_colors_map.append(self.graph_colors.get("preferable"))
-                elif self.robot.get_node_status(node) == "priority":
-                    node_colors_map.append(self.graph_colors.get("priority"))
-                elif self.robot.get_node_status(node) == "obstacle":
-                    node_colors_map.append(self.graph_colors.get("obstacle"))
-                else:
-                    node_colors_map.append(self.graph_colors.get("default"))
-            else:
-                if self.map_graph.nodes[node]['status'] == 'undiscovered_path':
-                    node_colors_map.append(self.graph_colors.get('undiscovered_path'))
-                elif self.map_graph.nodes[node]['status'] == 'undiscovered_obstacle':
-                    node_colors_map.append(self.graph_colors.get('undiscovered_obstacle'))
-                else:
-                    node_colors_map.append(self.graph_colors.get("default"))
-        self.ax.set_title(f"Passos redundantes: {self.robot.get_repeated_spaces()}")
-        nx.draw_networkx(self.graph_to_draw, pos=pos, node_color=node_colors_map, node_shape='s', with_labels=False)
-        self.ax.axis("off")
-        plt.tight_layout()
+    def create_memory(self) -> RobotMemory:
+        # As mudanças de cada passo só são guardadas quando alguém as lê.
+        return RobotMemory(self.map_size, track_changes=self.should_draw_map or self.frame_sink is not None)
+
+    def create_planner(self):
+        # Um planner por robô, já que cada um pode guardar estado da busca.
+        if self.planner is None:
+            return None
+        return PLANNERS[self.planner]()
 
     def create_obstacles(self, map=None) -> list:
-        node_list = []
         if map != None:
-            match map:
-                case 1:
-                    node_list.append((5, 0))
-                    node_list.append((5, 1))
-                    node_list.append((7, 1))
-                    node_list.append((8, 1))
-                    node_list.append((5, 2))
-                    node_list.append((8, 2))
-                    node_list.append((5, 3))
-                    node_list.append((8, 3))
-                    node_list.append((3, 4))
-                    node_list.append((5, 4))
-                    node_list.append((6, 4))
-                    node_list.append((7, 4))
-                    node_list.append((8, 4))
-                    node_list.append((1, 5))
-                    node_list.append((6, 5))
-                    node_list.append((2, 6))
-                    node_list.append((5, 6))
-                    node_list.append((2, 7))
-                    node_list.append((0, 8))
-                    node_list.append((3, 8))
-                    node_list.append((4, 9))
-
-            for node in node_list:
-                self.remove_edges_from_node(node)
+            node_list = self.map_store.obstacles(FIXED_MAPS[map])
+            self.map_graph.set_obstacles(node_list)
         else:
             node_list = self.create_random_obstacles()
 
         return node_list
 
+    def create_random_obstacle_map(self):
+        self.create_random_obstacles()
+        return self.map_graph.cells == OBSTACLE
+
     def create_random_obstacles(self) -> list:
-        min_obstaculos = int(15/100 * pow(self.map_size, 2))
-        max_obstaculos = int(25/100 * pow(self.map_size, 2))
-        number_of_obstacles = random.randint(min_obstaculos, max_obstaculos)
-        print(f"Gerando {number_of_obstacles} obstáculos")
-        connected_components = 1
-        created_objects = []
-        for i in range(number_of_obstacles):
-            creation_successful = False
-            while not creation_successful:
-                graph_copy = self.map_graph.copy()
-                obstacle = random.choice(list(node for node in self.map_graph.nodes() if node not in created_objects))
-                self.remove_edges_from_node(obstacle)
-                new_connected_components = nx.number_connected_components(self.map_graph)
-                if new_connected_components > connected_components + 1:
-                    self.map_graph = graph_copy
-                else:
-                    connected_components += 1
-                    creation_successful = True
-                    created_objects.append(obstacle)
+        if self.obstacle_density is None:
+            min_obstaculos = int(15/100 * pow(self.map_size, 2))
+            max_obstaculos = int(25/100 * pow(self.map_size, 2))
+            number_of_obstacles = self.rng.randint(min_obstaculos, max_obstaculos)
+        else:
+            number_of_obstacles = int(self.obstacle_density * pow(self.map_size, 2))
+        placer = ObstaclePlacer(self.map_size)
+        created_objects = placer.place_random(number_of_obstacles, self.rng)
+        print(f"Gerando {len(created_objects)} obstáculos")
+        if len(created_objects) < number_of_obstacles:
+            print(f"Aviso: só {len(created_objects)} de {number_of_obstacles} obstáculos cabem sem desconectar o mapa")
+        self.map_graph.set_obstacles(created_objects)
         return created_objects
-
-    def remove_edges_from_node(self, node):
-        self.map_graph.nodes[node]['status'] = 'undiscovered_obstacle'
-        edges = list(self.map_graph.edges(node))
-        self.map_graph.remove_edges_from(edges)
\ No newline at end of file
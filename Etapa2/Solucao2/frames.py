@@ -0,0 +1,17 @@
+class FrameRecorder:
+    # Guarda cada passo da simulação para desenhar depois, sem precisar de
+    # matplotlib durante a execução. Cada quadro guarda a posição de cada
+    # robô e só os nós da memória que mudaram de status desde o quadro
+    # anterior.
+
+    def __init__(self):
+        self.frames = []
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def record(self, positions, repeated_spaces, changes):
+        self.frames.append((positions, repeated_spaces, changes))
+
+    def replay(self):
+        return iter(self.frames)
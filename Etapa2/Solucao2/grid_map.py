@@ -0,0 +1,127 @@
+import numpy as np
+import networkx as nx
+from status import NodeStatus, STATUSES, UNDISCOVERED_PATH, UNDISCOVERED_OBSTACLE
+
+FREE = UNDISCOVERED_PATH
+OBSTACLE = UNDISCOVERED_OBSTACLE
+
+# Ordem fixa dos vizinhos, a mesma do nx.grid_2d_graph. A memória do robô
+# usava a ordem em que as arestas eram descobertas, então as buscas agora
+# desempatam de outro jeito e as trajetórias podem sair diferentes das da
+# versão com o grafo do networkx.
+NEIGHBOR_OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class GridMap:
+    # Mapa em grade com um uint8 por célula. A vizinhança é a de 4 células e
+    # fica implícita: duas células vizinhas estão ligadas se ambas são livres.
+
+    def __init__(self, map_size, cells=None):
+        self.map_size = map_size
+        if cells is None:
+            cells = np.full((map_size, map_size), FREE, dtype=np.uint8)
+        self.cells = cells
+        self.component_labels = None
+        self.component_sizes = None
+
+    def __contains__(self, node) -> bool:
+        return 0 <= node[0] < self.map_size and 0 <= node[1] < self.map_size
+
+    def __len__(self) -> int:
+        return self.map_size * self.map_size
+
+    def nodes(self):
+        n = self.map_size
+        return ((x, y) for x in range(n) for y in range(n))
+
+    def is_free(self, node) -> bool:
+        return node in self and self.cells[node] == FREE
+
+    def get_node_status(self, node) -> NodeStatus:
+        return STATUSES[self.cells[node]]
+
+    def set_obstacle(self, node):
+        self.cells[node] = OBSTACLE
+        self.component_labels = None
+
+    def set_obstacles(self, nodes):
+        if nodes:
+            xs, ys = zip(*nodes)
+            self.cells[list(xs), list(ys)] = OBSTACLE
+            self.component_labels = None
+
+    def set_obstacle_mask(self, mask):
+        # mask é um array bool do tamanho do mapa, True onde há obstáculo.
+        self.cells[np.asarray(mask, dtype=bool)] = OBSTACLE
+        self.component_labels = None
+
+    def obstacles(self) -> list:
+        return [tuple(node) for node in np.argwhere(self.cells == OBSTACLE).tolist()]
+
+    def neighbors(self, node):
+        if not self.is_free(node):
+            return []
+        x, y = node
+        return [(x + dx, y + dy) for dx, dy in NEIGHBOR_OFFSETS if self.is_free((x + dx, y + dy))]
+
+    def has_edge(self, u, v) -> bool:
+        if abs(u[0] - v[0]) + abs(u[1] - v[1]) != 1:
+            return False
+        return self.is_free(u) and self.is_free(v)
+
+    def label_components(self):
+        # Rotula as componentes conexas das células livres em O(N): cada
+        # trecho contínuo de células livres numa linha vira um nó, e trechos
+        # que se tocam entre linhas vizinhas são unidos num union-find.
+        # Obstáculos ficam com rótulo -1.
+        if self.component_labels is not None:
+            return self.component_labels
+
+        free = self.cells == FREE
+        starts = free.copy()
+        starts[:, 1:] &= ~free[:, :-1]
+        run_ids = np.cumsum(starts.ravel()).reshape(free.shape)
+        run_ids[~free] = 0
+        number_of_runs = int(run_ids.max())
+
+        parent = list(range(number_of_runs + 1))
+
+        def find(run):
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        touching = free[:-1] & free[1:]
+        pairs = np.unique(run_ids[:-1][touching] * (number_of_runs + 1) + run_ids[1:][touching])
+        for a, b in zip((pairs // (number_of_runs + 1)).tolist(), (pairs % (number_of_runs + 1)).tolist()):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+        roots = np.array([find(run) for run in range(number_of_runs + 1)], dtype=np.int64)
+        _, component_of_run = np.unique(roots[1:], return_inverse=True)
+        component_of_run = np.concatenate(([-1], component_of_run)).astype(np.int32)
+
+        self.component_labels = component_of_run[run_ids]
+        self.component_sizes = np.bincount(self.component_labels[free], minlength=component_of_run.max() + 1)
+        return self.component_labels
+
+    def largest_component(self) -> int:
+        self.label_components()
+        if len(self.component_sizes) == 0:
+            return -1
+        return int(np.argmax(self.component_sizes))
+
+    def is_reachable(self, u, v) -> bool:
+        labels = self.label_components()
+        return bool(labels[u] >= 0 and labels[u] == labels[v])
+
+    def to_networkx(self):
+        # Exportação só para desenhar com nx.draw_networkx.
+        graph = nx.grid_2d_graph(self.map_size, self.map_size)
+        for node in graph.nodes():
+            graph.nodes[node]['status'] = self.get_node_status(node)
+        for node in self.obstacles():
+            graph.remove_edges_from(list(graph.edges(node)))
+        return graph
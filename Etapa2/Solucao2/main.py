@@ -1,18 +1,31 @@
+import argparse
 from environment import Environment
+from profiler import Profiler
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profile', action='store_true', help='mede o tempo de cada fase e soma as tentativas no fim')
+    args = parser.parse_args()
+
     environment = Environment()
     total_passos, min_passos, max_passos, tentativas = 0, 999, 0, 1
+    perfil_total = Profiler() if args.profile else None
 
     for i in range(tentativas):
-        passos = environment.run_simulation(10)
+        perfil = Profiler() if args.profile else None
+        passos = environment.run_simulation(10, profiler=perfil)
         print(passos)
         total_passos += passos
         min_passos = min(min_passos, passos)
         max_passos = max(max_passos, passos)
+        if perfil is not None:
+            perfil_total.merge(perfil)
     
     print(f"Passos redundantes: {total_passos}. Mínimo: {min_passos}. Máximo: {max_passos}. Média: {total_passos / tentativas}")
+    if perfil_total is not None:
+        print(f"Perfil de {tentativas} tentativas:")
+        print(perfil_total.report())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+
+# Os mapas ficam em maps/ na raiz do repositório, onde a Etapa 3 e a Etapa 4
+# também leem os fixos.
+MAPS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'maps')
+CACHE_DIRECTORY = os.path.join(MAPS_DIRECTORY, 'cache')
+
+
+class MapStore:
+    # Mapas guardados como .npy: os fixos ficam em maps/ e os aleatórios já
+    # gerados em maps/cache/, com nome tirado de (tamanho, densidade,
+    # semente). Mapas de obstáculos são arrays bool (True = obstáculo) e
+    # mapas de terreno guardam o peso de cada célula. Os arquivos abrem com
+    # np.load(mmap_mode=...), então mesmo um mapa muito grande só é lido do
+    # disco quando alguma célula é acessada.
+
+    def __init__(self, directory=MAPS_DIRECTORY, cache_directory=CACHE_DIRECTORY):
+        self.directory = directory
+        self.cache_directory = cache_directory
+
+    def path(self, name) -> str:
+        if name.startswith('cache/'):
+            return os.path.join(self.cache_directory, name[len('cache/'):] + '.npy')
+        return os.path.join(self.directory, name + '.npy')
+
+    def __contains__(self, name) -> bool:
+        return os.path.exists(self.path(name))
+
+    def load(self, name, writable=False) -> np.ndarray:
+        # Com writable as escritas ficam só na memória (copy-on-write) e o
+        # arquivo não muda.
+        return np.load(self.path(name), mmap_mode='c' if writable else 'r')
+
+    def save(self, name, array):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Grava num arquivo temporário e troca de uma vez, para que dois
+        # processos gerando o mesmo mapa nunca leiam um arquivo pela metade.
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as file:
+            np.save(file, np.asarray(array))
+        os.replace(temporary_path, path)
+
+    def random_map_name(self, map_size, obstacle_density, seed) -> str:
+        density = 'random' if obstacle_density is None else obstacle_density
+        return f"cache/obstacles_{map_size}_{density}_{seed}"
+
+    def get_random_map(self, map_size, obstacle_density, seed, generate) -> np.ndarray:
+        # Devolve o mapa do cache, ou chama generate() e guarda o resultado.
+        name = self.random_map_name(map_size, obstacle_density, seed)
+        if name in self:
+            return self.load(name)
+        obstacles = generate()
+        self.save(name, obstacles)
+        return obstacles
+
+    def obstacles(self, name) -> list:
+        return [tuple(node) for node in np.argwhere(self.load(name)).tolist()]
@@ -0,0 +1,97 @@
+import random
+from collections import deque
+
+
+class ObstaclePlacer:
+    # Mapa de bloqueio com borda de 1 célula (sempre bloqueada), para que a
+    # vizinhança de qualquer célula possa ser lida sem checar limites.
+    # Índice plano de (x, y) = (x + 1) * stride + (y + 1).
+
+    def __init__(self, map_size):
+        self.map_size = map_size
+        self.stride = map_size + 2
+        self.blocked = bytearray([1]) * (self.stride * self.stride)
+        for x in range(map_size):
+            start = (x + 1) * self.stride + 1
+            self.blocked[start:start + map_size] = bytes(map_size)
+
+        s = self.stride
+        # Anel de 8 vizinhos em ordem circular: E, NE, N, NW, W, SW, S, SE.
+        # Posições pares são os vizinhos ortogonais (as arestas do grafo).
+        self.ring = (s, s + 1, 1, -s + 1, -s, -s - 1, -1, s - 1)
+
+    def node(self, index) -> tuple:
+        return (index // self.stride - 1, index % self.stride - 1)
+
+    def keeps_connectivity(self, index) -> bool:
+        # Checa se bloquear a célula mantém os vizinhos livres conectados entre
+        # si, olhando apenas o anel de 8 vizinhos. Se os vizinhos ortogonais
+        # livres formam um único grupo ligado pelo anel, a célula não é
+        # articulação. O teste é conservador: pode recusar células que só
+        # continuariam conectadas por um caminho longo, mas nunca aceita uma
+        # que desconecte o mapa.
+        blocked = self.blocked
+        ring = [not blocked[index + offset] for offset in self.ring]
+        free_neighbors = ring[0] + ring[2] + ring[4] + ring[6]
+        if free_neighbors <= 1:
+            return True
+        links = 0
+        for i in (0, 2, 4, 6):
+            if ring[i] and ring[i + 1] and ring[(i + 2) % 8]:
+                links += 1
+        return free_neighbors - links <= 1
+
+    def stays_connected(self, index) -> bool:
+        # Teste exato, mais caro: bloqueia a célula e faz uma busca em largura
+        # a partir de um vizinho livre até achar os outros vizinhos livres.
+        # Como o mapa livre já é conexo, basta eles continuarem ligados.
+        blocked = self.blocked
+        targets = {index + offset for offset in self.ring[::2] if not blocked[index + offset]}
+        if len(targets) <= 1:
+            return True
+        blocked[index] = 1
+        start = targets.pop()
+        seen = {start}
+        queue = deque([start])
+        while queue and targets:
+            current = queue.popleft()
+            for offset in self.ring[::2]:
+                neighbor = current + offset
+                if not blocked[neighbor] and neighbor not in seen:
+                    seen.add(neighbor)
+                    targets.discard(neighbor)
+                    queue.append(neighbor)
+        blocked[index] = 0
+        return not targets
+
+    def place_random(self, number_of_obstacles, rng=random) -> list:
+        n = self.map_size
+        candidates = [(x + 1) * self.stride + y + 1 for x in range(n) for y in range(n) if not self.blocked[(x + 1) * self.stride + y + 1]]
+        created_objects = []
+        while len(created_objects) < number_of_obstacles and candidates:
+            # Células recusadas podem virar válidas depois que vizinhos são
+            # bloqueados, então elas voltam para a próxima passada.
+            rng.shuffle(candidates)
+            rejected = []
+            for index in candidates:
+                if len(created_objects) == number_of_obstacles:
+                    break
+                if self.keeps_connectivity(index):
+                    self.blocked[index] = 1
+                    created_objects.append(self.node(index))
+                else:
+                    rejected.append(index)
+            if len(rejected) == len(candidates):
+                # O teste do anel recusou todas; as que ainda mantêm o mapa
+                # conectado por um caminho mais longo passam no teste exato.
+                rejected = []
+                for index in candidates:
+                    if len(created_objects) < number_of_obstacles and self.stays_connected(index):
+                        self.blocked[index] = 1
+                        created_objects.append(self.node(index))
+                    else:
+                        rejected.append(index)
+                if len(rejected) == len(candidates):
+                    break
+            candidates = rejected
+        return created_objects
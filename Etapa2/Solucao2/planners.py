@@ -0,0 +1,200 @@
+import heapq
+from collections import deque
+from time import perf_counter
+from status import FRONTIER_STATUSES, UNVISITED, PREFERABLE, PRIORITY
+
+# Maior pontuação de beco sem saída possível: 4 vizinhos valendo 2.
+MAX_DEAD_END_SCORE = 8
+
+
+class WallFollowingPlanner:
+    # A estratégia original da Solucao2. Segue a parede girando a partir de
+    # robot.rotation_offset (priority, depois preferable, depois unvisited ao
+    # lado) e, quando não há fronteira ao lado, busca em largura o nó de
+    # fronteira mais próximo.
+
+    def __init__(self, dead_end_weight=None):
+        self.dead_end_weight = dead_end_weight
+
+    def find_next_path(self, robot) -> deque:
+        if robot.status_index[PRIORITY]:
+            path = self.__search_nodes(robot, True)
+            if len(path) == 2:
+                return path
+
+        for i in range(12):
+            if i < 4:
+                move = self.__get_next_move(robot, PRIORITY)
+            elif i < 8:
+                move = self.__get_next_move(robot, PREFERABLE)
+            else:
+                move = self.__get_next_move(robot)
+            if move != ():
+                break
+            robot.rotation_offset = (1 + robot.rotation_offset) % 4
+        if move != ():
+            return deque([move])
+        return self.__search_nodes(robot)
+
+    def __search_nodes(self, robot, close_distance=False) -> deque:
+        # Uma única busca em largura por camadas acha o alvo e o caminho até
+        # ele. Entre os alvos da camada mais próxima vale priority, depois
+        # preferable, depois unvisited. Com close_distance só procura
+        # priority a até 3 passos.
+        if robot.profiler is not None:
+            start = perf_counter()
+        origin = robot.current_position
+        if close_distance:
+            targets = [PRIORITY]
+        else:
+            targets = [PRIORITY, PREFERABLE, UNVISITED]
+        node_status = robot.node_status
+        predecessors = {origin: None}
+        layer = [origin]
+        distance = 0
+        best_node, best_cost = None, None
+
+        while layer:
+            if close_distance and distance > 2:
+                break
+            if best_node is not None and self.dead_end_weight is not None and best_cost <= distance + 1 - self.dead_end_weight * MAX_DEAD_END_SCORE:
+                break
+
+            next_layer = []
+            for current_node in layer:
+                for neighbor in frontier_first(node_status, robot.memory.neighbors(current_node)):
+                    if neighbor in predecessors:
+                        continue
+                    predecessors[neighbor] = current_node
+                    next_layer.append(neighbor)
+                    status = node_status[neighbor]
+                    if status in targets and not robot.is_claimed_by_other(neighbor):
+                        cost = self.__frontier_cost(robot, neighbor, status, distance + 1, targets)
+                        if best_node is None or cost < best_cost:
+                            best_node, best_cost = neighbor, cost
+
+            if best_node is not None and self.dead_end_weight is None:
+                break
+            layer = next_layer
+            distance += 1
+
+        path = build_path(predecessors, origin, best_node)
+        if robot.profiler is not None:
+            # As buscas curtas atrás de priority ficam separadas das buscas
+            # completas, que são as que expandem mais nós.
+            name = 'close_bfs' if close_distance else 'bfs'
+            robot.profiler.count(name)
+            robot.profiler.count(f"{name}_nodes_expanded", len(predecessors))
+            robot.profiler.count(f"{name}_path_length", len(path))
+            robot.profiler.add_time(name, start)
+        return path
+
+    def __frontier_cost(self, robot, node, status, distance, targets):
+        # Sem dead_end_weight o custo só desempata a camada mais próxima pela
+        # classe do nó. Com ele, a busca continua como um Dijkstra de vários
+        # alvos e cada célula vale distância - peso * pontuação de beco.
+        if self.dead_end_weight is None:
+            return targets.index(status)
+        return distance - self.dead_end_weight * int(robot.dead_end_scores[node])
+
+    def __get_next_move(self, robot, priority=UNVISITED) -> tuple:
+        match robot.rotation_offset:
+            case 0:
+                return self.__get_nearby_node(robot, 'EAST', priority)
+            case 1:
+                return self.__get_nearby_node(robot, 'SOUTH', priority)
+            case 2:
+                return self.__get_nearby_node(robot, 'WEST', priority)
+            case 3:
+                return self.__get_nearby_node(robot, 'NORTH', priority)
+
+    def __get_nearby_node(self, robot, direction, priority):
+        next_node = robot.get_node_position(robot.current_position, direction)
+        if next_node in robot.graph and robot.node_status[next_node] == priority and not robot.is_claimed_by_other(next_node):
+            return next_node
+        else:
+            return ()
+
+
+class FrontierPlanner:
+    # Escolhe o alvo por custo: tamanho do caminho mais uma penalidade de
+    # peso * (8 - pontuação de beco), então becos sem saída perto custam menos
+    # que fronteira aberta no mesmo caminho. É um Dijkstra a partir do robô
+    # em que cada nó de fronteira tem uma aresta extra, com o peso da
+    # penalidade, até um destino comum; o primeiro destino tirado do heap é o
+    # alvo mais barato.
+
+    def __init__(self, dead_end_weight=1.0):
+        self.dead_end_weight = dead_end_weight
+
+    def find_next_path(self, robot) -> deque:
+        if robot.profiler is not None:
+            start = perf_counter()
+        origin = robot.current_position
+        node_status = robot.node_status
+        dead_end_scores = robot.dead_end_scores
+        distances = {origin: 0}
+        predecessors = {origin: None}
+        # (custo, ordem de inserção, nó, é destino); a ordem desempata sem
+        # comparar nós.
+        heap = [(0, 0, origin, False)]
+        pushed = 1
+        target = None
+        expanded = 0
+
+        while heap:
+            cost, _, node, is_target = heapq.heappop(heap)
+            if is_target:
+                target = node
+                break
+            if cost > distances[node]:
+                continue
+            expanded += 1
+            for neighbor in frontier_first(node_status, robot.memory.neighbors(node)):
+                distance = cost + 1
+                if distance >= distances.get(neighbor, distance + 1):
+                    continue
+                distances[neighbor] = distance
+                predecessors[neighbor] = node
+                heapq.heappush(heap, (distance, pushed, neighbor, False))
+                pushed += 1
+                if node_status[neighbor] in FRONTIER_STATUSES and not robot.is_claimed_by_other(neighbor):
+                    penalty = self.dead_end_weight * (MAX_DEAD_END_SCORE - int(dead_end_scores[neighbor]))
+                    heapq.heappush(heap, (distance + penalty, pushed, neighbor, True))
+                    pushed += 1
+
+        path = build_path(predecessors, origin, target)
+        if robot.profiler is not None:
+            robot.profiler.count('dijkstra')
+            robot.profiler.count('dijkstra_nodes_expanded', expanded)
+            robot.profiler.count('dijkstra_path_length', len(path))
+            robot.profiler.add_time('dijkstra', start)
+        return path
+
+
+PLANNERS = {
+    'wall_following': WallFollowingPlanner,
+    'frontier': FrontierPlanner
+}
+
+
+def frontier_first(node_status, neighbors) -> list:
+    unvisited_neighbors = []
+    visited_neighbors = []
+    for neighbor in neighbors:
+        if node_status[neighbor] in FRONTIER_STATUSES:
+            unvisited_neighbors.append(neighbor)
+        else:
+            visited_neighbors.append(neighbor)
+    return unvisited_neighbors + visited_neighbors
+
+
+def build_path(predecessors, origin, destination) -> deque:
+    path = deque()
+    if destination is None:
+        return path
+    current = destination
+    while current != origin:
+        path.appendleft(current)
+        current = predecessors[current]
+    return path
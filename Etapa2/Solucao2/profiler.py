@@ -0,0 +1,40 @@
+from time import perf_counter
+
+
+class Profiler:
+    # Contadores e tempos por fase da simulação. Robot e Environment guardam
+    # None quando o perfil está desligado, e cada ponto de medição é só um
+    # `if profiler is not None`.
+
+    def __init__(self):
+        self.counters = {}
+        self.times = {}
+        self.calls = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name, start):
+        # start é o perf_counter() do começo da fase.
+        self.times[name] = self.times.get(name, 0.0) + perf_counter() - start
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def merge(self, other):
+        for name, value in other.counters.items():
+            self.count(name, value)
+        for name, value in other.times.items():
+            self.times[name] = self.times.get(name, 0.0) + value
+            self.calls[name] = self.calls.get(name, 0) + other.calls[name]
+
+    def report(self) -> str:
+        lines = []
+        for name, total in sorted(self.times.items(), key=lambda item: -item[1]):
+            lines.append(f"{name}: {total:.4f}s em {self.calls[name]} chamadas ({total / self.calls[name] * 1e6:.1f} us/chamada)")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value}")
+        for name in ('bfs', 'close_bfs', 'dijkstra'):
+            calls = self.counters.get(name, 0)
+            if calls:
+                lines.append(f"{name}: {self.counters.get(f'{name}_nodes_expanded', 0) / calls:.1f} nós expandidos por busca, "
+                             f"caminho médio {self.counters.get(f'{name}_path_length', 0) / calls:.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,57 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import ListedColormap, to_rgb
+from status import NodeStatus
+
+
+class MapRenderer:
+    # Desenha o mapa como uma imagem de códigos NodeStatus. A cada quadro só as
+    # células que mudaram são reescritas no array e a imagem existente é
+    # atualizada com set_data, sem limpar e redesenhar os eixos.
+
+    def __init__(self, graph_colors, pause_interval=1, default_color="#DDDDDD"):
+        palette = [to_rgb(graph_colors.get(status, default_color)) for status in NodeStatus]
+        self.colormap = ListedColormap(np.array(palette))
+        self.pause_interval = pause_interval
+        self.fig = None
+        self.ax = None
+        self.image = None
+        self.codes = None
+        plt.ion()
+
+    def start(self, map_graph, draw_only_robot_memory=False):
+        if draw_only_robot_memory:
+            self.codes = np.full(map_graph.cells.shape, NodeStatus.UNKNOWN, dtype=np.uint8)
+        else:
+            self.codes = map_graph.cells.copy()
+        self.image = None
+
+    def draw(self, changes, repeated_spaces):
+        for node, status in changes.items():
+            self.codes[node] = status
+
+        if not self.fig or not plt.fignum_exists(self.fig.number):
+            self.fig, self.ax = plt.subplots(figsize=(8, 8))
+            self.image = None
+        if self.image is None:
+            self.ax.clear()
+            # codes é indexado por (x, y); a imagem espera (linha, coluna).
+            self.image = self.ax.imshow(self.codes.T, cmap=self.colormap, vmin=0, vmax=len(NodeStatus) - 1,
+                                        origin='lower', interpolation='nearest')
+            self.ax.axis("off")
+            plt.tight_layout()
+        else:
+            self.image.set_data(self.codes.T)
+        self.ax.set_title(f"Passos redundantes: {repeated_spaces}")
+        self.fig.canvas.draw_idle()
+        plt.pause(self.pause_interval)
+
+    def replay(self, map_graph, frame_recorder, draw_only_robot_memory=False):
+        self.start(map_graph, draw_only_robot_memory)
+        for positions, repeated_spaces, changes in frame_recorder.replay():
+            self.draw(changes, repeated_spaces)
+        self.show()
+
+    def show(self):
+        plt.ioff()
+        plt.show()
@@ -1,153 +1,145 @@
-import networkx as nx
 from collections import deque
+from time import perf_counter
+import numpy as np
+from grid_map import FREE
+from robot_memory import RobotMemory, DEAD_END_CLASSES
+from planners import WallFollowingPlanner
+from status import NodeStatus, FRONTIER_STATUSES, UNKNOWN, CURRENT, VISITED, OBSTACLE, UNVISITED, PREFERABLE, PRIORITY
 
 class Robot:
 
-    def __init__(self, starting_node, graph):
-        self.robot_memory = nx.empty_graph()
+    def __init__(self, starting_node, graph, dead_end_weight=None, memory=None, claimed_targets=None, profiler=None, sensor=None, planner=None):
+        if memory is None:
+            memory = RobotMemory(graph.map_size)
+        self.memory = memory
+        self.node_status = memory.node_status
+        self.status_index = memory.status_index
+        self.dead_end_scores = memory.dead_end_scores
         self.current_position = (starting_node)
         self.repeated_spaces = 0
+        self.steps = 0
         self.graph = graph
-        self.current_path = []
+        self.current_path = deque()
         self.rotation_offset = 2
-
-        self.robot_memory.add_node(self.current_position, status='current')
-        self.__update_neighbors()
+        # Estratégia que escolhe o próximo caminho; a padrão é a de seguir a
+        # parede, com dead_end_weight repassado para a busca.
+        if planner is None:
+            planner = WallFollowingPlanner(dead_end_weight)
+        self.planner = planner
+        # Alvos de busca reservados por cada robô quando vários exploram o
+        # mesmo mapa (nó -> robô). None para um robô sozinho.
+        self.claimed_targets = claimed_targets
+        self.target = None
+        self.profiler = profiler
+        # None é o sensor padrão, que só enxerga os 4 vizinhos.
+        self.sensor = sensor
+
+        self.set_node_status(self.current_position, CURRENT)
+        self.__sense()
 
     def get_robot_memory(self):
-        return self.robot_memory
+        return self.memory.to_networkx()
     
     def get_current_position(self):
         return self.current_position
     
     def get_repeated_spaces(self):
         return self.repeated_spaces
+
+    def get_steps(self):
+        return self.steps
     
+    def get_memory(self) -> RobotMemory:
+        return self.memory
+
     def set_node_status(self, node, status):
-        self.robot_memory.nodes[node]['status'] = status
+        self.memory.set_node_status(node, status)
+
+    def pop_changed_nodes(self) -> set:
+        return self.memory.pop_changed_nodes()
+
+    def get_node_status(self, node) -> NodeStatus:
+        return self.memory.get_node_status(node)
+
+    def get_node_status_array(self):
+        return self.node_status
 
-    def get_node_status(self, node) -> str:
-        return self.robot_memory.nodes[node]['status']
+    def get_dead_end_scores(self):
+        return self.dead_end_scores
     
     def move(self) -> bool:
+        if self.target is not None and self.node_status[self.target] not in FRONTIER_STATUSES:
+            # Outro robô chegou antes no alvo reservado.
+            self.current_path = deque()
+        profiler = self.profiler
         if len(self.current_path) == 0:
-            self.__find_next_path()
+            if profiler is not None:
+                start = perf_counter()
+            self.current_path = self.planner.find_next_path(self)
+            self.__claim_target()
+            if profiler is not None:
+                profiler.add_time('find_next_path', start)
         if len(self.current_path) > 0:
-            self.__move_to(self.current_path.pop(0))
+            self.__move_to(self.current_path.popleft())
             return True
         return False
         
-    def __find_next_path(self):
-        for node in self.robot_memory.nodes():
-            if self.get_node_status(node) == 'priority':
-                self.current_path = self.__search_nodes(True)
-                if len(self.current_path) == 2:
-                    return
-                else:
-                    self.current_path = []
-                    break
-        
-        for i in range(12):
-            if i < 4:
-                move = self.__get_next_move(self.rotation_offset, 'priority')
-            elif i < 8:
-                move = self.__get_next_move(self.rotation_offset, 'preferable')
-            else:
-                move = self.__get_next_move(self.rotation_offset)
-            if move != ():
-                break
-            self.rotation_offset = (1 + self.rotation_offset) % 4
-        if move != ():
-            self.current_path.append(move)
-        else:
-            self.current_path = self.__search_nodes()
+    def __claim_target(self):
+        if self.claimed_targets is None:
+            return
+        if self.target is not None and self.claimed_targets.get(self.target) is self:
+            del self.claimed_targets[self.target]
+        self.target = None
+        if len(self.current_path) > 0:
+            self.target = self.current_path[-1]
+            self.claimed_targets[self.target] = self
+
+    def is_claimed_by_other(self, node) -> bool:
+        return self.claimed_targets is not None and self.claimed_targets.get(node, self) is not self
 
     def __move_to(self, node):
-        for neighbor in self.robot_memory.neighbors(self.current_position):
-            if self.get_node_status(neighbor) == 'unvisited':
-                self.set_node_status(neighbor, 'unvisited')
-        if self.get_node_status(node) == 'visited':
+        for neighbor in self.memory.neighbors(self.current_position):
+            if self.get_node_status(neighbor) == UNVISITED:
+                self.set_node_status(neighbor, UNVISITED)
+        # Entrar onde outro robô está (CURRENT) também é passo repetido.
+        if self.get_node_status(node) in (VISITED, CURRENT):
             self.repeated_spaces += 1
-        self.set_node_status(self.current_position, 'visited')
+        self.steps += 1
+        self.set_node_status(self.current_position, VISITED)
         self.current_position = node
-        self.set_node_status(node, 'current')
-        self.__update_neighbors()
-
-    def __search_nodes(self, close_distance=False) -> list:
-        next_node = self.__find_closest_unvisited_node(close_distance)
-        path = self.__find_path_to(next_node)
-        return path
-
-    def __find_closest_unvisited_node(self, close_distance) -> tuple:
-        queue = deque([(self.current_position), 0])
-        searched_nodes = {self.current_position}
-
-        while queue:
-            current_node = queue.popleft()
-            distance = queue.popleft()
-
-            if close_distance and distance > 2:
-                return []
-
-            for neighbor in self.robot_memory.neighbors(current_node):
-                if neighbor not in searched_nodes:
-                    searched_nodes.add(neighbor)
+        self.set_node_status(node, CURRENT)
+        if self.profiler is not None:
+            start = perf_counter()
+            self.__sense()
+            self.profiler.add_time('update_neighbors', start)
+        else:
+            self.__sense()
 
-                    if self.get_node_status(neighbor) == 'priority':
-                        return neighbor
-                    
-                    if self.get_node_status(neighbor) == 'preferable' and not close_distance:
-                        return neighbor
-                    
-                    if self.get_node_status(neighbor) == 'unvisited' and not close_distance:
-                        return neighbor
-                    
-                    queue.append(neighbor)
-                    queue.append(distance + 1)
-
-        return []
-
-    def __find_path_to(self, destination) -> list:
-        origin = self.current_position
-        queue_path = deque([origin])
-        predecessors = {origin: None} 
-        path = []
-
-        path_found = False
-
-        while queue_path:
-            current_node = queue_path.popleft()
-
-            if current_node == destination:
-                path_found = True
-                break
-
-            unvisited_neighbors = []
-            visited_neighbors = []
-            
-            for neighbor in self.robot_memory.neighbors(current_node):
-                if self.get_node_status(neighbor) in ['unvisited', 'preferable', 'priority']:
-                    unvisited_neighbors.append(neighbor)
-                else:
-                    visited_neighbors.append(neighbor)
-
-            for neighbor in unvisited_neighbors:
-                if neighbor not in predecessors:
-                    predecessors[neighbor] = current_node
-                    queue_path.append(neighbor)
-            
-            for neighbor in visited_neighbors:
-                if neighbor not in predecessors:
-                    predecessors[neighbor] = current_node
-                    queue_path.append(neighbor)
-
-        if path_found:
-            current = destination
-            while current is not None:
-                path.insert(0, current)
-                current = predecessors[current]
-            path.remove(origin)
-        return path
+    def __sense(self):
+        if self.sensor is None or self.sensor.is_adjacent_only():
+            self.__update_neighbors()
+        else:
+            self.__sense_window()
+
+    def __sense_window(self):
+        # Descoberta em bloco para sensores com alcance maior: as células
+        # vistas pela primeira vez são copiadas do mapa real de uma vez, e
+        # depois a fronteira da janela (mais uma célula em volta, onde as
+        # pontuações de beco podem ter mudado) é reclassificada.
+        x0, y0, visible = self.sensor.window(self.graph.cells, self.current_position)
+        height, width = visible.shape
+        truth = self.graph.cells[x0:x0 + height, y0:y0 + width]
+        discovered = visible & (self.node_status[x0:x0 + height, y0:y0 + width] == UNKNOWN)
+        if discovered.any():
+            self.memory.set_window_status(x0, y0, np.where(truth == FREE, UNVISITED, OBSTACLE).astype(np.uint8), discovered)
+
+        x_start, y_start = max(x0 - 1, 0), max(y0 - 1, 0)
+        x_end, y_end = min(x0 + height + 1, self.graph.map_size), min(y0 + width + 1, self.graph.map_size)
+        statuses = self.node_status[x_start:x_end, y_start:y_end]
+        classes = DEAD_END_CLASSES[self.dead_end_scores[x_start:x_end, y_start:y_end]]
+        reclassified = (statuses >= UNVISITED) & (classes != statuses)
+        if reclassified.any():
+            self.memory.set_window_status(x_start, y_start, classes, reclassified)
 
     def __update_neighbors(self):
         next_node = (self.current_position[0] + 1, self.current_position[1])
@@ -160,72 +152,37 @@ class Robot:
         self.__update_neighbor(next_node)
 
     def __update_neighbor(self, node):
-        if node in self.graph.nodes():
-                if node not in self.robot_memory.nodes():
-                    self.robot_memory.add_node(node, status = 'unvisited')
-                if not self.get_node_status(node) == 'visited':
+        if node in self.graph:
+                if self.node_status[node] == UNKNOWN:
+                    self.set_node_status(node, UNVISITED)
+                # Com memória compartilhada o vizinho pode ser a célula de
+                # outro robô, que não volta a ser fronteira.
+                if self.node_status[node] not in (VISITED, CURRENT):
                     if self.graph.has_edge(self.current_position, node):
-                        self.robot_memory.add_edge(self.current_position, node)
-                        for neighbor in self.graph.neighbors(node):
-                            if self.graph.has_edge(neighbor, node) and neighbor in self.robot_memory.nodes():
-                                self.robot_memory.add_edge(neighbor, node)
                         self.set_node_status(node, self.__potential_dead_end(node))
                     else:
-                        self.set_node_status(node, 'obstacle')
+                        self.set_node_status(node, OBSTACLE)
                         directions = ['EAST', 'SOUTH', 'WEST', 'NORTH']
-                        robot_nodes = self.robot_memory.nodes()
                         for i in range(4):
-                            neighbor = self.__get_node_position(node, directions[i])
-                            if neighbor in robot_nodes:
-                                if self.get_node_status(neighbor) == 'unvisited' or self.get_node_status(neighbor) == 'preferable':
+                            neighbor = self.get_node_position(node, directions[i])
+                            if neighbor in self.graph:
+                                if self.node_status[neighbor] in (UNVISITED, PREFERABLE):
                                     self.set_node_status(neighbor, self.__potential_dead_end(neighbor))
                     
 
-    def __potential_dead_end(self, node) -> str:
-        directions = ['EAST', 'SOUTH', 'WEST', 'NORTH']
-        score = 0
-
-        for i in range(4):
-            next_node = self.__get_node_position(node, directions[i])
-            if not next_node in self.graph.nodes():
-                score += 2
-            if next_node in self.robot_memory.nodes() and self.get_node_status(next_node) == 'obstacle':
-                score += 2
-            if next_node in self.robot_memory.nodes() and (self.get_node_status(next_node) == 'visited' or next_node == self.current_position):
-                score += 1
-            if score >= 4:
-                return "priority"
+    def __potential_dead_end(self, node) -> NodeStatus:
+        score = self.__dead_end_score(node)
+        if score >= 4:
+            return PRIORITY
         if score >= 2:
-            return "preferable"
-        return "unvisited"
+            return PREFERABLE
+        return UNVISITED
 
-    def __get_next_move(self, side, priority='unvisited') -> tuple:
-        
-        rotate_anti_clockwise = False
-        side = (side + self.rotation_offset) % 4
-        if rotate_anti_clockwise:
-            if side == 0:
-                side = 2
-            elif side == 2:
-                side = 0
-        match self.rotation_offset:
-            case 0:
-                return self.__get_nearby_node('EAST', priority)
-            case 1:
-                return self.__get_nearby_node('SOUTH', priority)
-            case 2:
-                return self.__get_nearby_node('WEST', priority)
-            case 3:
-                return self.__get_nearby_node('NORTH', priority)
-            
-    def __get_nearby_node(self, direction, priority):
-        next_node = self.__get_node_position(self.current_position, direction)
-        if next_node in self.graph.nodes() and self.get_node_status(next_node) == priority:
-            return next_node
-        else:
-            return ()
-            
-    def __get_node_position(self, node, direction):
+    def __dead_end_score(self, node) -> int:
+        return int(self.dead_end_scores[node])
+
+
+    def get_node_position(self, node, direction):
         match direction:
             case 'EAST':
                 x_offset, y_offset = 1, 0
@@ -236,4 +193,4 @@ class Robot:
             case 'NORTH':
                 x_offset, y_offset = 0, 1
         next_node = (node[0] + x_offset, node[1] + y_offset)
-        return next_node
\ No newline at end of file
+        return next_node
@@ -0,0 +1,123 @@
+import numpy as np
+import networkx as nx
+from grid_map import NEIGHBOR_OFFSETS
+from status import NodeStatus, STATUSES, FRONTIER_STATUSES, UNKNOWN, CURRENT, VISITED, OBSTACLE, UNVISITED, PREFERABLE, PRIORITY
+
+# Quanto cada status soma na pontuação de beco sem saída dos seus vizinhos.
+DEAD_END_WEIGHTS = tuple(2 if status == OBSTACLE else 1 if status in (VISITED, CURRENT) else 0 for status in NodeStatus)
+
+# Status de nós livres já descobertos, os únicos por onde o robô passa.
+KNOWN_FREE = tuple(status in (CURRENT, VISITED, UNVISITED, PREFERABLE, PRIORITY) for status in NodeStatus)
+
+# Classe de fronteira de cada pontuação de beco (de 0 a 8).
+DEAD_END_CLASSES = np.array([PRIORITY if score >= 4 else PREFERABLE if score >= 2 else UNVISITED for score in range(9)], dtype=np.uint8)
+
+
+class RobotMemory:
+    # O que um robô sabe do mapa. Fica separado do Robot para que vários
+    # robôs possam compartilhar a mesma memória. Só o status de cada célula é
+    # guardado; as arestas saem dele (dois vizinhos livres e conhecidos).
+
+    def __init__(self, map_size, track_changes=False):
+        self.map_size = map_size
+        self.node_status = np.full((map_size, map_size), UNKNOWN, dtype=np.uint8)
+        # Nós de cada classe de fronteira, para saber sem varrer o mapa se
+        # ainda há algum priority. Os outros status não são indexados, já que
+        # crescem com o mapa e ninguém os lê.
+        self.status_index = {status: set() for status in FRONTIER_STATUSES}
+        self.dead_end_scores = self.__initial_dead_end_scores(map_size)
+        # Nós mudados desde o último pop_changed_nodes. Só quem desenha ou
+        # grava quadros lê isso, então sem track_changes fica None e nada é
+        # guardado.
+        self.changed_nodes = set() if track_changes else None
+
+    def set_node_status(self, node, status):
+        old_status = self.node_status[node]
+        if old_status in self.status_index:
+            self.status_index[old_status].discard(node)
+        self.node_status[node] = status
+        if status in self.status_index:
+            self.status_index[status].add(node)
+        if self.changed_nodes is not None:
+            self.changed_nodes.add(node)
+        delta = DEAD_END_WEIGHTS[status] - DEAD_END_WEIGHTS[old_status]
+        if delta:
+            self.__update_dead_end_scores(node, delta)
+
+    def set_window_status(self, x0, y0, statuses, mask):
+        # Versão em bloco de set_node_status: muda as células de uma janela
+        # do mapa com canto em (x0, y0) onde mask é True.
+        height, width = mask.shape
+        region = self.node_status[x0:x0 + height, y0:y0 + width]
+        old_statuses = region[mask]
+        new_statuses = statuses[mask]
+        xs, ys = np.nonzero(mask)
+        nodes = list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+        for status in np.unique(old_statuses).tolist():
+            if status in self.status_index:
+                self.status_index[status].difference_update([node for node, old in zip(nodes, old_statuses.tolist()) if old == status])
+        for status in np.unique(new_statuses).tolist():
+            if status in self.status_index:
+                self.status_index[status].update([node for node, new in zip(nodes, new_statuses.tolist()) if new == status])
+        region[mask] = new_statuses
+        if self.changed_nodes is not None:
+            self.changed_nodes.update(nodes)
+
+        weights = np.array(DEAD_END_WEIGHTS, dtype=np.int8)
+        deltas = np.zeros((height + 4, width + 4), dtype=np.int8)
+        deltas[2:-2, 2:-2][mask] = weights[new_statuses] - weights[old_statuses]
+        # Cada célula soma a mudança dos 4 vizinhos; a janela cresce uma
+        # célula para cada lado e é recortada nas bordas do mapa.
+        neighbor_sums = deltas[:-2, 1:-1] + deltas[2:, 1:-1] + deltas[1:-1, :-2] + deltas[1:-1, 2:]
+        x_start, y_start = max(x0 - 1, 0), max(y0 - 1, 0)
+        x_end, y_end = min(x0 + height + 1, self.map_size), min(y0 + width + 1, self.map_size)
+        self.dead_end_scores[x_start:x_end, y_start:y_end] += neighbor_sums[x_start - x0 + 1:x_end - x0 + 1, y_start - y0 + 1:y_end - y0 + 1]
+
+    def neighbors(self, node) -> list:
+        x, y = node
+        n = self.map_size
+        node_status = self.node_status
+        return [(x + dx, y + dy) for dx, dy in NEIGHBOR_OFFSETS
+                if 0 <= x + dx < n and 0 <= y + dy < n and KNOWN_FREE[node_status[x + dx, y + dy]]]
+
+    def to_networkx(self):
+        # Exportação só para desenhar ou comparar com a Solucao1.
+        graph = nx.Graph()
+        graph.add_nodes_from(tuple(node) for node in np.argwhere(self.node_status != UNKNOWN).tolist())
+        known_free = np.array(KNOWN_FREE)[self.node_status]
+        horizontal = np.argwhere(known_free[:-1] & known_free[1:]).tolist()
+        vertical = np.argwhere(known_free[:, :-1] & known_free[:, 1:]).tolist()
+        graph.add_edges_from(((x, y), (x + 1, y)) for x, y in horizontal)
+        graph.add_edges_from(((x, y), (x, y + 1)) for x, y in vertical)
+        return graph
+
+    def get_node_status(self, node) -> NodeStatus:
+        return STATUSES[self.node_status[node]]
+
+    def pop_changed_nodes(self) -> set:
+        if self.changed_nodes is None:
+            return set()
+        changed_nodes = self.changed_nodes
+        self.changed_nodes = set()
+        return changed_nodes
+
+    def __initial_dead_end_scores(self, map_size):
+        # Cada lado fora do mapa vale 2, como um obstáculo. O resto da
+        # pontuação é somado por set_node_status conforme os vizinhos mudam.
+        scores = np.zeros((map_size, map_size), dtype=np.int8)
+        scores[0, :] += 2
+        scores[-1, :] += 2
+        scores[:, 0] += 2
+        scores[:, -1] += 2
+        return scores
+
+    def __update_dead_end_scores(self, node, delta):
+        x, y = node
+        if x + 1 < self.map_size:
+            self.dead_end_scores[x + 1, y] += delta
+        if y > 0:
+            self.dead_end_scores[x, y - 1] += delta
+        if x > 0:
+            self.dead_end_scores[x - 1, y] += delta
+        if y + 1 < self.map_size:
+            self.dead_end_scores[x, y + 1] += delta
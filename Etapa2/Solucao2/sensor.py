@@ -0,0 +1,66 @@
+import numpy as np
+
+from grid_map import OBSTACLE
+
+SENSOR_METRICS = ('manhattan', 'chebyshev', 'line_of_sight')
+
+
+class Sensor:
+    # Alcance do sensor do robô. A cada passo o robô enxerga uma janela de
+    # (2 * radius + 1)² células em volta dele, recortada do mapa real com uma
+    # fatia e filtrada por uma máscara pré-calculada com o formato do alcance:
+    # losango (manhattan), quadrado (chebyshev) ou círculo em que obstáculos
+    # bloqueiam a visão (line_of_sight).
+
+    def __init__(self, radius=1, metric='manhattan'):
+        if radius < 1:
+            raise ValueError(f"O alcance do sensor precisa ser pelo menos 1, não {radius}")
+        if metric not in SENSOR_METRICS:
+            raise ValueError(f"Métrica de sensor desconhecida: {metric}. Use uma de {', '.join(SENSOR_METRICS)}")
+        self.radius = radius
+        self.metric = metric
+
+        offsets = np.arange(-radius, radius + 1)
+        dx, dy = np.meshgrid(offsets, offsets, indexing='ij')
+        if metric == 'manhattan':
+            self.mask = np.abs(dx) + np.abs(dy) <= radius
+        elif metric == 'chebyshev':
+            self.mask = np.maximum(np.abs(dx), np.abs(dy)) <= radius
+        else:
+            self.mask = dx * dx + dy * dy <= radius * radius
+            self.rays = self.__create_rays(dx, dy)
+
+    def is_adjacent_only(self) -> bool:
+        # O sensor padrão, que o Robot trata pelo caminho rápido de 4 vizinhos.
+        return self.radius == 1 and self.metric in ('manhattan', 'line_of_sight')
+
+    def window(self, cells, position):
+        # Devolve o canto (x0, y0) da janela recortada nas bordas do mapa e a
+        # máscara das células visíveis dentro dela.
+        x, y = position
+        r = self.radius
+        x0, x1 = max(x - r, 0), min(x + r + 1, cells.shape[0])
+        y0, y1 = max(y - r, 0), min(y + r + 1, cells.shape[1])
+        visible = self.mask[x0 - x + r:x1 - x + r, y0 - y + r:y1 - y + r]
+        if self.metric == 'line_of_sight':
+            visible = visible & self.__line_of_sight(cells, x, y)[x0 - x + r:x1 - x + r, y0 - y + r:y1 - y + r]
+        return x0, y0, visible
+
+    def __create_rays(self, dx, dy):
+        # Para cada célula da janela, as células no meio da reta até o centro.
+        # Retas mais curtas são completadas com o próprio centro, que é livre.
+        length = max(1, 2 * self.radius)
+        ray_x = np.zeros(dx.shape + (length,), dtype=np.int64)
+        ray_y = np.zeros(dx.shape + (length,), dtype=np.int64)
+        for i, j in np.ndindex(dx.shape):
+            steps = max(abs(int(dx[i, j])), abs(int(dy[i, j])))
+            for t in range(1, steps):
+                ray_x[i, j, t - 1] = int(np.floor(dx[i, j] * t / steps + 0.5))
+                ray_y[i, j, t - 1] = int(np.floor(dy[i, j] * t / steps + 0.5))
+        return ray_x, ray_y
+
+    def __line_of_sight(self, cells, x, y):
+        ray_x, ray_y = self.rays
+        xs = np.clip(x + ray_x, 0, cells.shape[0] - 1)
+        ys = np.clip(y + ray_y, 0, cells.shape[1] - 1)
+        return ~(cells[xs, ys] == OBSTACLE).any(axis=2)
@@ -0,0 +1,36 @@
+from enum import IntEnum
+
+
+class NodeStatus(IntEnum):
+    # Códigos pequenos para caber num uint8. UNKNOWN é o valor das células que
+    # o robô ainda não conhece. As três classes de fronteira ficam em
+    # sequência (UNVISITED < PREFERABLE < PRIORITY).
+    UNKNOWN = 0
+    UNDISCOVERED_PATH = 1
+    UNDISCOVERED_OBSTACLE = 2
+    CURRENT = 3
+    VISITED = 4
+    OBSTACLE = 5
+    UNVISITED = 6
+    PREFERABLE = 7
+    PRIORITY = 8
+
+
+# Para converter o valor guardado no array de volta em NodeStatus sem chamar
+# o construtor do enum.
+STATUSES = tuple(NodeStatus)
+
+# Atalhos em int puro para os laços mais usados. Comparar um escalar do
+# NumPy com um membro do enum faz o NumPy procurar atributos __array_*__ no
+# enum, e no Python 3.11 cada procura passa pelo __getattr__ do Enum.
+UNKNOWN = int(NodeStatus.UNKNOWN)
+UNDISCOVERED_PATH = int(NodeStatus.UNDISCOVERED_PATH)
+UNDISCOVERED_OBSTACLE = int(NodeStatus.UNDISCOVERED_OBSTACLE)
+CURRENT = int(NodeStatus.CURRENT)
+VISITED = int(NodeStatus.VISITED)
+OBSTACLE = int(NodeStatus.OBSTACLE)
+UNVISITED = int(NodeStatus.UNVISITED)
+PREFERABLE = int(NodeStatus.PREFERABLE)
+PRIORITY = int(NodeStatus.PRIORITY)
+
+FRONTIER_STATUSES = frozenset([UNVISITED, PREFERABLE, PRIORITY])
@@ -0,0 +1,114 @@
+import struct
+
+import numpy as np
+
+from grid_map import GridMap, FREE, OBSTACLE
+from sensor import Sensor, SENSOR_METRICS
+
+# Cabeçalho: assinatura, tamanho do mapa, número de robôs, memória
+# compartilhada, bits por movimento, número de tiques e o sensor (alcance 0
+# para o sensor padrão, e o índice da métrica em SENSOR_METRICS).
+HEADER = struct.Struct('<8sHHBBIHB')
+MAGIC = b'SOL2TRC2'
+
+# Códigos de movimento na mesma ordem de direções do Robot. STAY é um robô
+# que ficou parado no tique.
+MOVES = ((1, 0), (0, -1), (-1, 0), (0, 1))
+STAY = 4
+
+
+class Trace:
+    # Uma simulação gravada: o mapa, a posição de cada robô em cada tique, se
+    # a memória era compartilhada e o sensor usado. No arquivo o mapa vira um bit por célula
+    # e cada passo um código de 2 bits (4 quando algum robô fica parado).
+
+    def __init__(self, map_graph, positions, shared_memory=True, sensor=None):
+        self.map_graph = map_graph
+        self.map_size = map_graph.map_size
+        # (tiques + 1, robôs, 2); a primeira linha é a partida.
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.shared_memory = shared_memory
+        self.sensor = sensor
+
+    def __len__(self) -> int:
+        return len(self.positions) - 1
+
+    def get_starts(self) -> list:
+        return [tuple(position) for position in self.positions[0].tolist()]
+
+    def replay(self):
+        # Posições de todos os robôs a cada tique, depois da partida.
+        for positions in self.positions[1:].tolist():
+            yield [tuple(position) for position in positions]
+
+    def move_codes(self) -> np.ndarray:
+        deltas = np.diff(self.positions, axis=0)
+        codes = np.full(deltas.shape[:2], STAY, dtype=np.uint8)
+        for code, move in enumerate(MOVES):
+            codes[(deltas == move).all(axis=2)] = code
+        return codes
+
+    def save(self, path):
+        codes = self.move_codes().ravel()
+        bits = 2 if (codes != STAY).all() else 4
+        with open(path, 'wb') as file:
+            radius, metric = (0, 0) if self.sensor is None else (self.sensor.radius, SENSOR_METRICS.index(self.sensor.metric))
+            file.write(HEADER.pack(MAGIC, self.map_size, self.positions.shape[1], self.shared_memory, bits, len(self), radius, metric))
+            file.write(np.packbits(self.map_graph.cells == OBSTACLE).tobytes())
+            file.write(self.positions[0].astype('<u2').tobytes())
+            file.write(pack_codes(codes, bits).tobytes())
+
+
+class TraceRecorder:
+    # Frame sink que guarda só as posições dos robôs, para virar um Trace no
+    # fim da simulação.
+
+    def __init__(self):
+        self.positions = []
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def record(self, positions, repeated_spaces, changes):
+        self.positions.append(positions)
+
+    def to_trace(self, map_graph, shared_memory=True, sensor=None) -> Trace:
+        # O último quadro repete o anterior (nenhum robô tinha para onde ir),
+        # então fica de fora e um robô sozinho cabe em 2 bits por passo.
+        positions = self.positions
+        while len(positions) > 1 and positions[-1] == positions[-2]:
+            positions = positions[:-1]
+        return Trace(map_graph, positions, shared_memory, sensor)
+
+
+def load_trace(path) -> Trace:
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, map_size, robot_count, shared_memory, bits, ticks, radius, metric = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} não é um trace da Solucao2")
+    offset = HEADER.size
+
+    map_bytes = (map_size * map_size + 7) // 8
+    obstacles = np.unpackbits(np.frombuffer(data, np.uint8, map_bytes, offset), count=map_size * map_size).astype(bool)
+    offset += map_bytes
+    cells = np.where(obstacles, OBSTACLE, FREE).astype(np.uint8).reshape(map_size, map_size)
+
+    starts = np.frombuffer(data, '<u2', robot_count * 2, offset).astype(np.int64).reshape(robot_count, 2)
+    offset += robot_count * 4
+
+    codes = unpack_codes(np.frombuffer(data, np.uint8, offset=offset), bits, ticks * robot_count).reshape(ticks, robot_count)
+    deltas = np.array(MOVES + ((0, 0),), dtype=np.int64)[codes]
+    positions = np.concatenate((starts[None], starts + np.cumsum(deltas, axis=0)))
+    sensor = Sensor(radius, SENSOR_METRICS[metric]) if radius else None
+    return Trace(GridMap(map_size, cells), positions, bool(shared_memory), sensor)
+
+
+def pack_codes(codes, bits) -> np.ndarray:
+    shifts = np.arange(bits - 1, -1, -1, dtype=np.uint8)
+    return np.packbits(((codes[:, None] >> shifts) & 1).astype(np.uint8))
+
+
+def unpack_codes(packed, bits, count) -> np.ndarray:
+    unpacked = np.unpackbits(packed, count=count * bits).reshape(count, bits)
+    return (unpacked << np.arange(bits - 1, -1, -1, dtype=np.uint8)).sum(axis=1).astype(np.uint8)
@@ -0,0 +1,87 @@
+import argparse
+import time
+
+import networkx as nx
+import numpy as np
+
+from routing_map import RoutingMap
+
+METHODS = ('nx_bfs_edges', 'grid_bfs', 'grid_bidirectional')
+
+
+def create_obstacle_map(map_size, obstacle_density, rng) -> np.ndarray:
+    return rng.random((map_size, map_size)) < obstacle_density
+
+
+def create_queries(obstacle_map, count, rng) -> list:
+    free = np.argwhere(~obstacle_map)
+    pairs = rng.choice(len(free), size=(count, 2))
+    return [(tuple(free[a].tolist()), tuple(free[b].tolist())) for a, b in pairs]
+
+
+def nx_find_path(graph, source, destination):
+    # O find_path original da Etapa 3: árvore inteira do nx.bfs_edges e um
+    # dicionário de pais. Devolve o caminho e quantos nós a busca alcançou.
+    bfs_edges = list(nx.bfs_edges(graph, source))
+    parents = {v: u for u, v in bfs_edges}
+    if destination != source and destination not in parents:
+        return [], len(bfs_edges) + 1
+    path = [destination]
+    while path[-1] != source:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return path, len(bfs_edges) + 1
+
+
+def run_size(map_size, obstacle_density, query_count, nx_max_size, rng) -> dict:
+    obstacle_map = create_obstacle_map(map_size, obstacle_density, rng)
+    queries = create_queries(obstacle_map, query_count, rng)
+    routing_map = RoutingMap(obstacle_map)
+    search = routing_map.get_grid_search()
+    graph = routing_map.graph if map_size <= nx_max_size else None
+
+    results = {}
+    lengths = {}
+    for method in METHODS:
+        if method == 'nx_bfs_edges' and graph is None:
+            continue
+        expanded = []
+        start = time.perf_counter()
+        for source, destination in queries:
+            if method == 'nx_bfs_edges':
+                path, count = nx_find_path(graph, source, destination)
+            elif method == 'grid_bfs':
+                path, count = search.find_path(source, destination), search.expanded
+            else:
+                path, count = search.find_path_bidirectional(source, destination), search.expanded
+            expanded.append(count)
+            lengths.setdefault((source, destination), set()).add(len(path))
+        results[method] = (np.mean(expanded), (time.perf_counter() - start) / len(queries))
+
+    # Todas as buscas precisam achar caminhos do mesmo tamanho.
+    for query, sizes in lengths.items():
+        if len(sizes) > 1:
+            raise RuntimeError(f"Caminhos de tamanhos diferentes para {query}: {sorted(sizes)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara a busca em largura do networkx com a busca no array de obstáculos, de uma e de duas pontas.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 200, 500, 1000, 2000])
+    parser.add_argument('--density', type=float, default=0.2, help='fração de obstáculos')
+    parser.add_argument('--queries', type=int, default=10, help='consultas (origem, destino) por tamanho')
+    parser.add_argument('--nx-max-size', type=int, default=500, help='maior mapa em que o networkx roda (o grafo de 2000x2000 não cabe em pouca memória)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for map_size in args.sizes:
+        results = run_size(map_size, args.density, args.queries, args.nx_max_size, rng)
+        reference = results.get('nx_bfs_edges', results['grid_bfs'])
+        for method, (expanded, wall_time) in results.items():
+            print(f"mapa {map_size} | {method} | nós expandidos: {expanded:.0f} ({expanded / reference[0]:.2f}x) | "
+                  f"tempo por consulta: {wall_time * 1000:.2f} ms ({wall_time / reference[1]:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
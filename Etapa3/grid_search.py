@@ -0,0 +1,111 @@
+import numpy as np
+
+
+class GridSearch:
+    # Busca em largura direto no mapa de obstáculos (array bool, True =
+    # obstáculo), sem grafo do networkx. Os nós são índices x * n + y e cada
+    # camada da busca é expandida de uma vez com NumPy. Cada lado guarda o
+    # pai e a distância de cada nó alcançado (-1 = não alcançado); os arrays
+    # são alocados uma vez e só os nós alcançados voltam para -1 no fim de
+    # cada busca, então uma busca curta não paga pelo tamanho do mapa.
+
+    def __init__(self, obstacle_map):
+        self.obstacle_map = np.asarray(obstacle_map, dtype=bool)
+        self.shape = self.obstacle_map.shape
+        self.blocked = self.obstacle_map.ravel()
+        # Quantos nós saíram da fila na última busca.
+        self.expanded = 0
+        self.sides = [(np.full(self.blocked.size, -1, dtype=np.int32), np.full(self.blocked.size, -1, dtype=np.int32)) for _ in range(2)]
+        self.reached = []
+
+    def find_path(self, source, destination) -> list:
+        # Busca só a partir da origem, parando na camada do destino.
+        source, destination = self.__to_index(source), self.__to_index(destination)
+        if source == destination:
+            return [self.__to_node(source)]
+        if self.blocked[source] or self.blocked[destination]:
+            return []
+        parents, distances = self.__start(0, source)
+        frontier = np.array([source])
+        self.expanded = 0
+        while len(frontier) > 0 and parents[destination] == -1:
+            self.expanded += len(frontier)
+            frontier = self.__expand(frontier, parents, distances)
+        path = self.__build_path(parents, destination) if parents[destination] != -1 else []
+        self.__reset()
+        return path
+
+    def find_path_bidirectional(self, source, destination) -> list:
+        # Uma busca a partir de cada ponta, expandindo sempre a de fronteira
+        # menor, até as duas se encontrarem. A camada onde o encontro
+        # acontece é expandida inteira e o caminho passa pelo nó de encontro
+        # de menor distância total, então o caminho é o mais curto.
+        source, destination = self.__to_index(source), self.__to_index(destination)
+        if source == destination:
+            return [self.__to_node(source)]
+        if self.blocked[source] or self.blocked[destination]:
+            return []
+        sides = [self.__start(0, source), self.__start(1, destination)]
+        frontiers = [np.array([source]), np.array([destination])]
+        self.expanded = 0
+        path = []
+        while len(frontiers[0]) > 0 and len(frontiers[1]) > 0:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            parents, distances = sides[side]
+            other_parents, other_distances = sides[1 - side]
+            self.expanded += len(frontiers[side])
+            frontiers[side] = self.__expand(frontiers[side], parents, distances)
+            meetings = frontiers[side][other_parents[frontiers[side]] != -1]
+            if len(meetings) > 0:
+                meeting = meetings[np.argmin(other_distances[meetings])]
+                forward = self.__build_path(sides[0][0], meeting)
+                backward = self.__build_path(sides[1][0], meeting)
+                path = forward + backward[-2::-1]
+                break
+        self.__reset()
+        return path
+
+    def __start(self, side, origin):
+        parents, distances = self.sides[side]
+        parents[origin] = origin
+        distances[origin] = 0
+        self.reached.append(np.array([origin]))
+        return parents, distances
+
+    def __reset(self):
+        reached = np.concatenate(self.reached)
+        for parents, distances in self.sides:
+            parents[reached] = -1
+            distances[reached] = -1
+        self.reached = []
+
+    def __expand(self, frontier, parents, distances):
+        height, width = self.shape
+        x, y = frontier // width, frontier % width
+        candidates = np.concatenate((frontier[x > 0] - width, frontier[x < height - 1] + width,
+                                     frontier[y > 0] - 1, frontier[y < width - 1] + 1))
+        origins = np.concatenate((frontier[x > 0], frontier[x < height - 1], frontier[y > 0], frontier[y < width - 1]))
+        new = ~self.blocked[candidates] & (parents[candidates] == -1)
+        candidates, origins = candidates[new], origins[new]
+        # Um nó alcançado por mais de um pai fica com a última escrita; como
+        # um pai não repete vizinho, manter só quem venceu tira as repetições
+        # sem ordenar.
+        parents[candidates] = origins
+        winners = parents[candidates] == origins
+        candidates, origins = candidates[winners], origins[winners]
+        distances[candidates] = distances[origins] + 1
+        self.reached.append(candidates)
+        return candidates
+
+    def __build_path(self, parents, node) -> list:
+        path = [node]
+        while parents[path[-1]] != path[-1]:
+            path.append(int(parents[path[-1]]))
+        path.reverse()
+        return [self.__to_node(index) for index in path]
+
+    def __to_index(self, node) -> int:
+        return node[0] * self.shape[1] + node[1]
+
+    def __to_node(self, index) -> tuple:
+        return (int(index) // self.shape[1], int(index) % self.shape[1])
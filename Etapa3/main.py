@@ -1,82 +1,69 @@
+import os
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 
-graph = nx.grid_2d_graph(10, 10)
+from routing_map import RoutingMap, find_paths_parallel
+
+# Mapas fixos em maps/ na raiz do repositório (os mesmos da Etapa 2), pelo
+# número usado em create_routing_map.
+MAPS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'maps')
+FIXED_MAPS = {1: 'default'}
+
+FREE_COLOR = '#DDDDDD'
+OBSTACLE_COLOR = "#225C95"
+# Uma cor por caminho quando vários são desenhados juntos; com mais caminhos
+# do que cores elas se repetem.
+PATH_COLORS = ['#aaeeaa', '#eeaaaa', '#aaaaee', '#eeeeaa', '#eeaaee', '#aaeeee']
+PALETTE = np.array([FREE_COLOR, OBSTACLE_COLOR] + PATH_COLORS)
 
 def main():
-    obstacle_list = create_obstacles(1)
-    path = create_path((0,9), (7,2), obstacle_list)
-    print_graph(path)
+    routing_map = create_routing_map(1)
+    path = create_path(routing_map, (0,9), (7,2))
+    print_graph(routing_map, path)
 
-def create_path(source, destination, obstacles) -> list:
-    path = find_path(source, destination)
-    colored_path = color_path(path, obstacles)
+def create_path(routing_map, source, destination) -> list:
+    path = find_path(routing_map, source, destination)
+    colored_path = color_path(routing_map, path)
     return colored_path
 
-def find_path(source, destination) -> list:
-    bfs_edges = list(nx.bfs_edges(graph, source))
+def create_paths(routing_map, queries) -> list:
+    paths = find_paths(routing_map, queries)
+    return color_paths(routing_map, paths)
+
+def find_path(routing_map, source, destination, bidirectional=False) -> list:
+    return routing_map.find_path(source, destination, bidirectional)
 
-    parents = {v: u for u, v in bfs_edges}
-    path = [destination]
-    while path[-1] != source:
-        path.append(parents[path[-1]])
-    path.reverse()
+def find_paths(routing_map, queries, bidirectional=False, workers=1) -> list:
+    # Com workers != 1 as consultas são divididas entre processos que leem o
+    # mesmo mapa em memória compartilhada (None usa um por CPU).
+    if workers == 1:
+        return routing_map.find_paths(queries, bidirectional)
+    return find_paths_parallel(routing_map, queries, workers, bidirectional)
 
-    return path
+def color_path(routing_map, path) -> list:
+    return color_paths(routing_map, [path])
 
-def color_path(path, obstacles) -> list:
-    color_map = []
-    for node in graph:
-        if node in path:
-            color_map.append('#aaeeaa')
-        elif node in obstacles:
-            color_map.append("#225C95")
-        else:   
-            color_map.append('#DDDDDD')
-    return color_map
+def color_paths(routing_map, paths) -> list:
+    # Monta um array com o índice da cor de cada célula (caminho por cima de
+    # obstáculo, e o último caminho por cima dos anteriores). Os nós do grafo
+    # estão em ordem de linha, a mesma do array achatado.
+    color_index = routing_map.obstacle_map.astype(np.uint8)
+    for i, path in enumerate(paths):
+        if len(path) > 0:
+            color_index[tuple(np.array(path).T)] = 2 + i % len(PATH_COLORS)
+    return PALETTE[color_index.ravel()].tolist()
 
-def print_graph(color_map):
+def print_graph(routing_map, color_map):
+    graph = routing_map.graph
     pos = {node: node for node in graph.nodes()}
     nx.draw_networkx(graph, pos=pos, node_color=color_map, node_shape='s', with_labels=False)
     plt.tight_layout()
     plt.axis("off")
     plt.show()
 
-def create_obstacles(map) -> list:
-    node_list = []
-    
-    match map:
-        case 1:
-            node_list.append((5, 0))
-            node_list.append((5, 1))
-            node_list.append((7, 1))
-            node_list.append((8, 1))
-            node_list.append((5, 2))
-            node_list.append((8, 2))
-            node_list.append((5, 3))
-            node_list.append((8, 3))
-            node_list.append((3, 4))
-            node_list.append((5, 4))
-            node_list.append((6, 4))
-            node_list.append((7, 4))
-            node_list.append((8, 4))
-            node_list.append((1, 5))
-            node_list.append((6, 5))
-            node_list.append((2, 6))
-            node_list.append((5, 6))
-            node_list.append((2, 7))
-            node_list.append((0, 8))
-            node_list.append((3, 8))
-            node_list.append((4, 9))
-
-    for node in node_list:
-        remove_edges_from_node(node)
-
-    return node_list
-
-def remove_edges_from_node(node):
-    edges = list(graph.edges(node))
-    graph.remove_edges_from(edges)
+def create_routing_map(map) -> RoutingMap:
+    return RoutingMap(np.load(os.path.join(MAPS_DIRECTORY, FIXED_MAPS[map] + '.npy'), mmap_mode='r'))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,97 @@
+from array import array
+from collections import OrderedDict, deque
+import numpy as np
+
+# Quantas árvores de busca ficam guardadas antes de descartar a usada há
+# mais tempo.
+DEFAULT_CACHE_SIZE = 64
+
+
+class PathService:
+    # Responde muitas consultas de caminho no mesmo mapa. Para cada origem
+    # guarda a árvore da busca em largura como um array de predecessores
+    # (índice do nó -> índice do pai), então cada consulta só anda o caminho
+    # de volta. As árvores ficam num cache LRU. Uma consulta avulsa, de uma
+    # origem que não está no cache, para a busca assim que chega no destino.
+    #
+    # A busca lê direto o array de obstáculos (True = obstáculo), por um
+    # memoryview, com os nós como índices x * largura + y, como no
+    # GridSearch; nada é copiado, então o array pode estar em memória
+    # compartilhada. Os vizinhos são visitados na ordem de graph.adj do
+    # nx.grid_2d_graph (x - 1, x + 1, y - 1, y + 1), a mesma do
+    # nx.bfs_edges, então os caminhos são os mesmos de antes. Um destino que
+    # não é alcançável dá um caminho vazio, como no GridSearch.
+
+    def __init__(self, obstacle_map, cache_size=DEFAULT_CACHE_SIZE):
+        self.obstacle_map = np.asarray(obstacle_map, dtype=bool)
+        self.shape = self.obstacle_map.shape
+        self.blocked = memoryview(self.obstacle_map.reshape(-1).view(np.uint8))
+        self.cache_size = cache_size
+        self.clear()
+
+    def clear(self):
+        self.trees = OrderedDict()
+
+    def find_path(self, source, destination) -> list:
+        tree = self.trees.get(source)
+        if tree is not None:
+            self.trees.move_to_end(source)
+        else:
+            tree = self.__search(self.__to_index(source), self.__to_index(destination))
+        return self.__build_path(tree, self.__to_index(source), self.__to_index(destination))
+
+    def find_paths(self, queries) -> list:
+        # Várias consultas (origem, destino) de uma vez: cada origem tem a
+        # árvore completa montada uma vez e guardada.
+        return [self.__build_path(self.get_tree(source), self.__to_index(source), self.__to_index(destination)) for source, destination in queries]
+
+    def get_tree(self, source) -> array:
+        tree = self.trees.get(source)
+        if tree is not None:
+            self.trees.move_to_end(source)
+            return tree
+        tree = self.__search(self.__to_index(source))
+        self.trees[source] = tree
+        if len(self.trees) > self.cache_size:
+            self.trees.popitem(last=False)
+        return tree
+
+    def __search(self, source, destination=None) -> array:
+        # -1 é nó ainda não alcançado; a origem aponta para si mesma. Um
+        # obstáculo não tem vizinhos, como no grafo sem as arestas dele.
+        height, width = self.shape
+        blocked = self.blocked
+        predecessors = array('i', [-1]) * (height * width)
+        predecessors[source] = source
+        if source == destination or blocked[source]:
+            return predecessors
+        last_row = (height - 1) * width
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            y = current % width
+            for neighbor, inside in ((current - width, current >= width), (current + width, current < last_row),
+                                     (current - 1, y > 0), (current + 1, y < width - 1)):
+                if inside and predecessors[neighbor] == -1 and not blocked[neighbor]:
+                    predecessors[neighbor] = current
+                    if neighbor == destination:
+                        return predecessors
+                    queue.append(neighbor)
+        return predecessors
+
+    def __build_path(self, tree, source, destination) -> list:
+        if tree[destination] == -1:
+            return []
+        path = [self.__to_node(destination)]
+        current = destination
+        while current != source:
+            current = tree[current]
+            path.append(self.__to_node(current))
+        path.reverse()
+        return path
+
+    def __to_index(self, node) -> int:
+        return node[0] * self.shape[1] + node[1]
+
+    def __to_node(self, index) -> tuple:
+        return divmod(index, self.shape[1])
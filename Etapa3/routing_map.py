@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import networkx as nx
+import numpy as np
+
+from grid_search import GridSearch
+from path_service import PathService
+
+
+class RoutingMap:
+    # Um mapa de rotas: o array de obstáculos (True = obstáculo), que nunca
+    # muda depois de criado, e as buscas feitas nele. Vários mapas podem
+    # existir ao mesmo tempo, e os objetos de busca, que guardam estado, são
+    # criados sob demanda e um por thread. As duas buscas leem o próprio
+    # array; o grafo do networkx só é montado para desenhar ou comparar.
+    #
+    # share() copia o array para um bloco de multiprocessing.shared_memory.
+    # Um RoutingMap nesse bloco vai para outros processos só com o nome do
+    # bloco e o formato, e cada processo lê o mesmo array sem copiar.
+
+    def __init__(self, obstacle_map, shared_block=None, owner=False):
+        obstacle_map = np.asarray(obstacle_map, dtype=bool)
+        if shared_block is None:
+            obstacle_map = obstacle_map.copy()
+        obstacle_map.flags.writeable = False
+        self.obstacle_map = obstacle_map
+        self.map_size = obstacle_map.shape[0]
+        self.shared_block = shared_block
+        self.owner = owner
+        self.graph_lock = threading.Lock()
+        self.graph_cache = None
+        self.local = threading.local()
+
+    @property
+    def graph(self):
+        # Grade completa sem as arestas dos obstáculos, na ordem de nós do
+        # nx.grid_2d_graph. Só é montado por quem usa o networkx.
+        with self.graph_lock:
+            if self.graph_cache is None:
+                graph = nx.grid_2d_graph(*self.obstacle_map.shape)
+                for node in map(tuple, np.argwhere(self.obstacle_map).tolist()):
+                    graph.remove_edges_from(list(graph.edges(node)))
+                nx.freeze(graph)
+                self.graph_cache = graph
+            return self.graph_cache
+
+    def obstacles(self) -> list:
+        return [tuple(node) for node in np.argwhere(self.obstacle_map).tolist()]
+
+    def find_path(self, source, destination, bidirectional=False) -> list:
+        # bidirectional busca das duas pontas no array de obstáculos; o caminho
+        # tem o mesmo tamanho, mas pode ser outro entre os mais curtos. Nos
+        # dois modos um destino inalcançável devolve [].
+        if bidirectional:
+            return self.get_grid_search().find_path_bidirectional(source, destination)
+        return self.get_path_service().find_path(source, destination)
+
+    def find_paths(self, queries, bidirectional=False) -> list:
+        if bidirectional:
+            search = self.get_grid_search()
+            return [search.find_path_bidirectional(source, destination) for source, destination in queries]
+        return self.get_path_service().find_paths(queries)
+
+    def get_path_service(self) -> PathService:
+        if not hasattr(self.local, 'path_service'):
+            self.local.path_service = PathService(self.obstacle_map)
+        return self.local.path_service
+
+    def get_grid_search(self) -> GridSearch:
+        if not hasattr(self.local, 'grid_search'):
+            self.local.grid_search = GridSearch(self.obstacle_map)
+        return self.local.grid_search
+
+    def share(self):
+        # Devolve um RoutingMap com o array num bloco de memória
+        # compartilhada. Quem chamou share() é o dono e apaga o bloco no
+        # close().
+        block = shared_memory.SharedMemory(create=True, size=max(1, self.obstacle_map.nbytes))
+        shared_map = np.ndarray(self.obstacle_map.shape, dtype=bool, buffer=block.buf)
+        shared_map[:] = self.obstacle_map
+        return RoutingMap(shared_map, block, owner=True)
+
+    def close(self):
+        if self.shared_block is None:
+            return
+        # O array aponta para o bloco; solta ele antes de fechar.
+        self.obstacle_map = None
+        self.graph_cache = None
+        self.local = threading.local()
+        self.shared_block.close()
+        if self.owner:
+            self.shared_block.unlink()
+        self.shared_block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        if self.shared_block is None:
+            return {'obstacle_map': self.obstacle_map}
+        return {'block_name': self.shared_block.name, 'shape': self.obstacle_map.shape}
+
+    def __setstate__(self, state):
+        if 'obstacle_map' in state:
+            self.__init__(state['obstacle_map'])
+            return
+        # Os processos filhos usam o mesmo rastreador de recursos do dono,
+        # então o bloco só é apagado pelo unlink() do dono.
+        block = shared_memory.SharedMemory(name=state['block_name'])
+        self.__init__(np.ndarray(state['shape'], dtype=bool, buffer=block.buf), block)
+
+
+worker_map = None
+
+
+def set_worker_map(routing_map):
+    global worker_map
+    worker_map = routing_map
+
+
+def find_worker_paths(queries, bidirectional):
+    return worker_map.find_paths(queries, bidirectional)
+
+
+def find_paths_parallel(routing_map, queries, workers=None, bidirectional=False, chunk_size=64) -> list:
+    # Divide as consultas entre processos. O mapa vai uma vez para cada
+    # processo, pela memória compartilhada.
+    chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+    with routing_map.share() as shared_map:
+        with ProcessPoolExecutor(max_workers=workers, initializer=set_worker_map, initargs=(shared_map,)) as executor:
+            results = executor.map(find_worker_paths, chunks, [bidirectional] * len(chunks))
+            return [path for paths in results for path in paths]
@@ -0,0 +1,84 @@
+import argparse
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy as np
+
+from grid_dijkstra import shortest_path_on_grid
+
+METHODS = ('nx_shortest_path', 'grid_dijkstra', 'grid_astar')
+
+
+def nx_shortest_path(weights, source, target):
+    # O caminho original da Parte 1: DiGraph com peso em cada aresta (o peso
+    # da célula de chegada) e nx.shortest_path. Montar o grafo entra no tempo.
+    grid = weights.tolist()
+    rows, columns = len(grid), len(grid[0])
+    graph = nx.DiGraph()
+    for row in range(rows):
+        for column in range(columns):
+            graph.add_node((row, column), weight=grid[row][column])
+    for row in range(rows):
+        for column in range(columns):
+            for direction_row, direction_column in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                new_row, new_column = row + direction_row, column + direction_column
+                if 0 <= new_row < rows and 0 <= new_column < columns:
+                    graph.add_edge((row, column), (new_row, new_column), weight=grid[new_row][new_column])
+    path = nx.shortest_path(graph, source=source, target=target, weight='weight')
+    return path, sum(graph[u][v]['weight'] for u, v in zip(path, path[1:]))
+
+
+def run_method(method, weights, source, target):
+    if method == 'nx_shortest_path':
+        return nx_shortest_path(weights, source, target)
+    return shortest_path_on_grid(weights, source, target, heuristic=method == 'grid_astar')
+
+
+def run_size(map_size, rng, nx_max_size, measure_memory) -> dict:
+    # Terreno com os pesos do mapa da Parte 1 (1, 2 e 3), de um canto ao outro.
+    weights = rng.integers(1, 4, size=(map_size, map_size))
+    source, target = (0, 0), (map_size - 1, map_size - 1)
+    results = {}
+    costs = set()
+    for method in METHODS:
+        if method == 'nx_shortest_path' and map_size > nx_max_size:
+            continue
+        start = time.perf_counter()
+        _, cost = run_method(method, weights, source, target)
+        wall_time = time.perf_counter() - start
+        costs.add(cost)
+        peak = None
+        if measure_memory:
+            # Rodada separada, já que o tracemalloc deixa tudo mais lento.
+            tracemalloc.start()
+            run_method(method, weights, source, target)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[method] = (wall_time, peak)
+    if len(costs) > 1:
+        raise RuntimeError(f"Custos diferentes no mapa {map_size}: {sorted(costs)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara o nx.shortest_path da Parte 1 com o Dijkstra/A* direto na matriz de pesos.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--nx-max-size', type=int, default=300, help='maior mapa em que o networkx roda (o DiGraph de 1000x1000 ocupa alguns GB)')
+    parser.add_argument('--memory', action='store_true', help='mede o pico de memória de cada método com tracemalloc')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for map_size in args.sizes:
+        results = run_size(map_size, rng, args.nx_max_size, args.memory)
+        reference = results.get('nx_shortest_path', results['grid_dijkstra'])
+        for method, (wall_time, peak) in results.items():
+            line = f"mapa {map_size} | {method} | tempo: {wall_time:.3f}s ({reference[0] / wall_time:.1f}x mais rápido)"
+            if peak is not None:
+                line += f" | pico de memória: {peak / 2 ** 20:.1f} MB ({reference[1] / peak:.1f}x menos)"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import heapq
+import numpy as np
+
+
+def shortest_path_on_grid(weights, source, target, heuristic=False):
+    # Dijkstra direto na matriz de pesos, sem montar grafo. Entrar numa
+    # célula custa o peso dela, como as arestas do grafo da Parte 1. A
+    # matriz ganha uma borda de custo infinito, então os vizinhos de um nó
+    # são só índice ± 1 e ± largura, sem testar os limites. O heap guarda
+    # (prioridade, custo, nó) e distância e predecessor ficam em arrays do
+    # NumPy, lidos por memoryview no laço para não criar um escalar do NumPy
+    # a cada acesso.
+    #
+    # Com heuristic vira A*: a prioridade soma a distância de Manhattan até o
+    # destino vezes o menor peso do mapa, que nunca passa do custo real,
+    # então o caminho continua sendo o mais barato.
+    #
+    # O custo é sempre o do nx.shortest_path, mas entre caminhos de mesmo
+    # custo o escolhido pode ser outro: o networkx busca das duas pontas e
+    # desempata pela ordem de inserção, e aqui o empate sai pelo índice do
+    # nó. No terrain.npy da Parte 1 o caminho de (0, 5) a (9, 5) passa por
+    # (0, 4) e (0, 3) em vez de (1, 5) e (1, 4), com o mesmo custo 16.
+    #
+    # Devolve (caminho, custo), ou ([], None) se o destino não é alcançável.
+    weights = np.asarray(weights)
+    rows, columns = weights.shape
+    if weights.min() < 0:
+        raise ValueError("O Dijkstra não aceita pesos negativos")
+    width = columns + 2
+    padded = np.full((rows + 2, width), np.inf)
+    padded[1:-1, 1:-1] = weights
+    costs = padded.ravel().tolist()
+    scale = weights.min().item() if heuristic else 0
+
+    distance_array = np.full(padded.size, np.inf)
+    predecessor_array = np.full(padded.size, -1, dtype=np.int64)
+    distances = memoryview(distance_array)
+    predecessors = memoryview(predecessor_array)
+    start = (source[0] + 1) * width + source[1] + 1
+    goal = (target[0] + 1) * width + target[1] + 1
+    goal_row, goal_column = divmod(goal, width)
+    distances[start] = 0
+    predecessors[start] = start
+    heap = [(0, 0, start)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while heap:
+        _, cost, node = heappop(heap)
+        if node == goal:
+            break
+        if cost > distances[node]:
+            continue
+        for neighbor in (node + width, node - width, node + 1, node - 1):
+            new_cost = cost + costs[neighbor]
+            if new_cost < distances[neighbor]:
+                distances[neighbor] = new_cost
+                predecessors[neighbor] = node
+                if scale:
+                    row, column = divmod(neighbor, width)
+                    heappush(heap, (new_cost + scale * (abs(row - goal_row) + abs(column - goal_column)), new_cost, neighbor))
+                else:
+                    heappush(heap, (new_cost, new_cost, neighbor))
+
+    if predecessors[goal] == -1:
+        return [], None
+    path = [goal]
+    while path[-1] != start:
+        path.append(predecessors[path[-1]])
+    path.reverse()
+    cost = sum(costs[node] for node in path[1:])
+    if weights.dtype.kind in 'iu':
+        cost = int(cost)
+    return [(node // width - 1, node % width - 1) for node in path], cost
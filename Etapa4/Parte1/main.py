@@ -1,20 +1,15 @@
 import matplotlib
 matplotlib.use("TkAgg")
+import os
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 
-grid = [
-    [1,1,1,1,1,1,1,1,1,1],
-    [1,1,1,1,1,1,1,1,1,1],
-    [1,1,1,1,1,3,1,1,1,1],
-    [1,1,2,2,1,3,3,2,1,1],
-    [1,1,2,1,3,3,3,2,1,1],
-    [1,1,2,2,3,3,3,2,2,1],
-    [1,1,1,2,3,1,2,2,1,1],
-    [1,1,1,1,2,3,1,1,1,1],
-    [1,1,1,1,1,1,1,1,1,1],
-    [1,1,1,1,1,1,1,1,1,1],
-]
+from grid_dijkstra import shortest_path_on_grid
+
+# Pesos do terreno, em maps/ na raiz do repositório.
+MAPS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'maps')
+grid = np.load(os.path.join(MAPS_DIRECTORY, 'terrain.npy')).tolist()
 
 ROWS = len(grid)
 COLS = len(grid[0])
@@ -46,14 +41,6 @@ def create_edges_with_weights(G):
 
     return G
 
-def shortest_path_and_cost(G, source, target):
-    path = nx.shortest_path(G, source=source, target=target, weight='weight')
-    cost = 0
-    for i in range(len(path)-1):
-        u, v = path[i], path[i+1]
-        cost += G[u][v]['weight']
-    return path, cost
-
 def draw(G, path):
     pos = {n: n for n in G.nodes()}
     node_list = list(G.nodes())
@@ -75,13 +62,14 @@ def draw(G, path):
     plt.show()
 
 def main():
-    G = build_graph_from_grid(grid)
     source = (0,5)
     target = (9,5)
 
-    path, cost = shortest_path_and_cost(G, source, target)
+    path, cost = shortest_path_on_grid(grid, source, target)
     print("Caminho mais curto:", cost)
 
+    # O grafo só é montado para desenhar.
+    G = build_graph_from_grid(grid)
     draw(G, path)
 
 if __name__ == "__main__":
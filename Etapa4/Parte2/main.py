@@ -1,20 +1,13 @@
 import matplotlib
 matplotlib.use("TkAgg")
+import os
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 
-grid = [
-    [1,1,1,1,1,1,1,1,1,1],
-    [1,1,1,1,1,1,1,1,1,1],
-    [1,1,1,1,1,3,1,1,1,1],
-    [1,1,2,2,1,3,3,2,1,1],
-    [1,1,2,1,3,3,3,2,1,1],
-    [1,1,2,2,3,3,3,2,2,1],
-    [1,1,1,2,3,1,2,2,1,1],
-    [1,1,1,1,2,3,1,1,1,1],
-    [1,1,1,1,1,1,1,1,1,1],
-    [1,1,1,1,1,1,1,1,1,1],
-]
+# Pesos do terreno, em maps/ na raiz do repositório.
+MAPS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'maps')
+grid = np.load(os.path.join(MAPS_DIRECTORY, 'terrain.npy')).tolist()
 
 ROWS = len(grid)
 COLS = len(grid[0])